@@ -0,0 +1,120 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type, \
+    Union
+
+import chess
+import numpy as np
+
+from chevy.cache import position_cache, position_key
+from chevy.compact import compact_class
+from chevy.context import PositionContext
+from chevy.encoding import decode, decode_many, is_records
+from chevy.features import BoardFeaturesBase
+from chevy.registry import REGISTRY
+from chevy.schema import SCHEMA, Layout, columns, feature_names, layout, \
+    write
+
+# feature name -> (feature class, number of columns)
+FEATURES: Dict[str, Tuple[Type[BoardFeaturesBase], int]] = {
+    name: (REGISTRY[name].feature_class, spec.width)
+    for name, spec in SCHEMA.items()
+}
+
+# variable length features (one entry per piece) - stored as the `width`
+# largest values in descending order, missing entries are filled
+RANKED_FEATURES = {name for name, spec in SCHEMA.items() if spec.ranked}
+
+# (features, fill value, dtype) of rows kept in chevy.cache.position_cache ->
+# id used in their keys
+_CACHED_ROWS: Dict[Tuple[Tuple[str, ...], Optional[int], str], int] = {}
+
+
+def schema(features: Optional[Sequence[str]] = None) -> List[str]:
+    return columns(features)
+
+
+def extract(boards: Union[Iterable[Union[chess.Board, str, bytes]],
+                          np.ndarray],
+            colors: Union[chess.Color, Sequence[chess.Color]] = chess.WHITE,
+            features: Optional[Sequence[str]] = None,
+            dtype=np.int16,
+            fill_value: Optional[int] = None,
+            cache: bool = False) -> Tuple[np.ndarray, List[str]]:
+    # boards are chess.Board objects, FENs, positions packed with
+    # chevy.encoding.encode or an array of them from encode_many; missing
+    # values are set to the schema fill values unless `fill_value` is given;
+    # with `cache`, rows of positions seen before (transpositions included)
+    # are copied from chevy.cache.position_cache
+    if isinstance(boards, np.ndarray) and is_records(boards):
+        boards = decode_many(boards)
+    elif not isinstance(boards, Sequence):
+        boards = list(boards)
+    # plain or numpy booleans, as accepted by chevy.vectorized.extract
+    if isinstance(colors, (bool, np.bool_)):
+        colors = [bool(colors)] * len(boards)
+    elif len(colors) != len(boards):
+        raise ValueError(
+            f"got {len(colors)} colors for {len(boards)} boards"
+        )
+    else:
+        colors = [bool(color) for color in colors]
+
+    names = feature_names(features)
+    row_layout = layout(names, fill_value)
+    plan = _plan(row_layout)
+    out = np.empty((len(boards), len(row_layout.columns)), dtype=dtype)
+    out[:] = row_layout.fill_values
+
+    row_id = None
+    if cache:
+        row_id = _CACHED_ROWS.setdefault(
+            (tuple(names), fill_value, out.dtype.str), len(_CACHED_ROWS)
+        )
+    for i, (board, color) in enumerate(zip(boards, colors)):
+        if isinstance(board, str):
+            board = chess.Board(board)
+        elif isinstance(board, bytes):
+            board = decode(board)
+        if row_id is None:
+            _fill_row(out[i], board, color, plan, PositionContext(board))
+        else:
+            _fill_cached_row(out[i], board, color, plan, row_id)
+    return out, list(row_layout.columns)
+
+
+def _plan(row_layout: Layout) \
+        -> List[Tuple[Type[BoardFeaturesBase], List[Tuple[str, int, int]]]]:
+    # group requested features by class so that each class is instantiated
+    # once per position, keeping track of column offsets; objects are only
+    # used to fill rows, so their compact variants are used
+    groups: Dict[Type[BoardFeaturesBase], List[Tuple[str, int, int]]] = {}
+    for name, offset, width in row_layout.offsets:
+        feature_class = compact_class(REGISTRY[name].feature_class)
+        groups.setdefault(feature_class, []).append((name, offset, width))
+    return list(groups.items())
+
+
+def _fill_row(row: np.ndarray, board: chess.Board, color: chess.Color,
+              plan: List[Tuple[Type[BoardFeaturesBase],
+                               List[Tuple[str, int, int]]]],
+              context: PositionContext) -> None:
+    for feature_class, items in plan:
+        instance = feature_class(board, color, context)
+        for name, offset, _ in items:
+            write(row, offset, name, REGISTRY[name].function(instance))
+
+
+def _fill_cached_row(row: np.ndarray, board: chess.Board,
+                     color: chess.Color,
+                     plan: List[Tuple[Type[BoardFeaturesBase],
+                                      List[Tuple[str, int, int]]]],
+                     row_id: int) -> None:
+    # rows are shared between transpositions: the cache keeps a copy of the
+    # filled row, not the feature objects
+    def compute() -> np.ndarray:
+        _fill_row(row, board, color, plan, PositionContext(board))
+        return row.copy()
+
+    row[:] = position_cache.get_or_compute(
+        (*position_key(board, color), row_id), compute
+    )
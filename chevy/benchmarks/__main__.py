@@ -0,0 +1,52 @@
+from __future__ import annotations
+import argparse
+import json
+import sys
+from typing import Optional, Sequence
+
+from chevy.benchmarks.positions import POSITIONS, fens
+from chevy.benchmarks.suite import SECTIONS, compare, format_results, run, \
+    selected_sections
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m chevy.benchmarks",
+        description="Measure feature extraction speed and memory on the "
+                    "bundled positions."
+    )
+    parser.add_argument("--positions", nargs="+", choices=list(POSITIONS),
+                        help="position groups to use (default: all)")
+    parser.add_argument("--sections", nargs="+", choices=SECTIONS,
+                        help="benchmarks to run (default: all)")
+    parser.add_argument("--number", type=int, default=3,
+                        help="passes over the positions per measurement")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="measurements per benchmark, the best is kept")
+    parser.add_argument("--save", metavar="PATH",
+                        help="write results as JSON")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="JSON results to compare against, exits with "
+                             "status 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative slowdown when comparing")
+    args = parser.parse_args(argv)
+
+    results = run(fens(args.positions), selected_sections(args.sections),
+                  number=args.number, repeat=args.repeat)
+    print(format_results(results))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for section, name, old, new in regressions:
+            print(f"regression: {section}/{name} {old:.1f} -> {new:.1f}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
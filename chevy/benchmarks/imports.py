@@ -0,0 +1,46 @@
+from __future__ import annotations
+import subprocess
+import sys
+from typing import Dict, List, Sequence
+
+# modules measured by default
+MODULES = ("chevy.features", "chevy.batch", "chevy.pipeline")
+# heavy dependencies chevy.features must not load at import time
+LAZY_DEPENDENCIES = ("numpy", "scipy", "cachetools", "chess.pgn",
+                     "chess.polyglot")
+
+
+def import_time(module: str, repeat: int = 5) -> float:
+    # cumulative import time of `module` in a fresh interpreter, in
+    # milliseconds (best of `repeat`)
+    best = float("inf")
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, check=True
+        ).stderr
+        for line in output.splitlines():
+            # import time: self [us] | cumulative | imported package
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2].strip() == module and \
+                    not parts[2][1:].startswith(" "):
+                best = min(best, int(parts[1]) / 1000)
+    return best
+
+
+def import_times(modules: Sequence[str] = MODULES,
+                 repeat: int = 5) -> Dict[str, float]:
+    return {module: import_time(module, repeat) for module in modules}
+
+
+def loaded_modules(module: str,
+                   candidates: Sequence[str] = LAZY_DEPENDENCIES) -> List[str]:
+    # which of `candidates` get imported along with `module`
+    code = (
+        f"import sys, {module}; "
+        f"print(' '.join(m for m in {list(candidates)!r} "
+        f"if m in sys.modules))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                            text=True, check=True).stdout
+    return output.split()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+import argparse
+import io
+import random
+import timeit
+from typing import Callable, Dict, Optional, Sequence
+
+import chess
+import chess.pgn
+
+from chevy.pgn import read_mainline
+
+
+def sample_pgn(games: int = 50, seed: int = 0) -> str:
+    # random games annotated like engine-analysed archives: a comment after
+    # every move and a short side variation every few moves
+    rng = random.Random(seed)
+    exported = []
+    for i in range(games):
+        game = chess.pgn.Game()
+        game.headers["Event"] = f"sample {i}"
+        node: chess.pgn.GameNode = game
+        board = chess.Board()
+        for ply in range(rng.randint(40, 120)):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            move = rng.choice(moves)
+            if ply % 6 == 5 and len(moves) > 1:
+                side = node.add_variation(
+                    rng.choice([m for m in moves if m != move])
+                )
+                side.comment = "also possible"
+            node = node.add_main_variation(move)
+            node.comment = f"[%eval {rng.uniform(-3, 3):.2f}]"
+            board.push(move)
+        exported.append(str(game))
+    return "\n\n".join(exported) + "\n"
+
+
+def readers() -> Dict[str, Callable[[io.StringIO], object]]:
+    return {
+        "read_game": chess.pgn.read_game,
+        "read_mainline": read_mainline,
+        "read_mainline (no headers)":
+            lambda handle: read_mainline(handle, headers=False),
+    }
+
+
+def games_per_second(pgn: str, number: int = 3,
+                     repeat: int = 3) -> Dict[str, float]:
+    games = 0
+    handle = io.StringIO(pgn)
+    while chess.pgn.skip_game(handle):
+        games += 1
+    result = {}
+    for name, read in readers().items():
+        def func() -> None:
+            handle = io.StringIO(pgn)
+            while read(handle) is not None:
+                pass
+
+        best = min(timeit.repeat(func, number=number, repeat=repeat))
+        result[name] = games * number / best
+    return result
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m chevy.benchmarks.pgn",
+        description="Compare games/second of chess.pgn.read_game and the "
+                    "mainline reader of chevy.pgn."
+    )
+    parser.add_argument("pgn", nargs="?", default=None,
+                        help="PGN file (default: generated sample games)")
+    parser.add_argument("--games", type=int, default=50,
+                        help="number of generated games")
+    parser.add_argument("--number", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.pgn is None:
+        pgn = sample_pgn(args.games)
+    else:
+        with open(args.pgn) as f:
+            pgn = f.read()
+    result = games_per_second(pgn, args.number)
+    for name, value in result.items():
+        print(f"{name:<28} {value:10.1f} games/s")
+    print(f"{'speedup':<28} "
+          f"{result['read_mainline'] / result['read_game']:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
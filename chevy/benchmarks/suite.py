@@ -0,0 +1,241 @@
+from __future__ import annotations
+import gc
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import chess
+
+from chevy import cache
+from chevy.batch import extract
+from chevy.benchmarks.imports import import_times
+from chevy.benchmarks.pgn import games_per_second, sample_pgn
+from chevy.compact import compact_class
+from chevy.context import PositionContext
+from chevy.encoding import decode_many, encode_many
+from chevy.extractor import FeatureExtractor
+from chevy.features import BoardFeatures, KingSafety, PawnStructure
+from chevy.registry import REGISTRY
+from chevy.schema import class_features
+from chevy.vectorized import from_records
+
+FEATURE_CLASSES = (BoardFeatures, KingSafety, PawnStructure)
+SECTIONS = ("features", "classes", "extraction", "parsing", "memory",
+            "imports", "pgn")
+UNITS = {
+    "features": "positions/s",
+    "classes": "positions/s",
+    "extraction": "positions/s",
+    "parsing": "positions/s",
+    "memory": "bytes/instance",
+    "imports": "ms",
+    "pgn": "games/s",
+}
+LOWER_IS_BETTER = {"memory", "imports"}
+
+# section -> benchmark name -> value in the section unit
+Results = Dict[str, Dict[str, float]]
+
+
+def run(fens: Sequence[str], sections: Sequence[str] = SECTIONS,
+        number: int = 3, repeat: int = 3) -> Results:
+    boards = [chess.Board(fen) for fen in fens]
+    benchmarks = {
+        "features": _feature_benchmarks,
+        "classes": _class_benchmarks,
+        "extraction": _extraction_benchmarks,
+        "parsing": _parsing_benchmarks,
+    }
+    results: Results = {}
+    for section in sections:
+        if section == "memory":
+            results[section] = memory_per_instance(boards)
+            continue
+        if section == "imports":
+            results[section] = import_times(repeat=repeat)
+            continue
+        if section == "pgn":
+            # generated annotated games, independent of `fens`
+            results[section] = games_per_second(sample_pgn(10), number,
+                                                repeat)
+            continue
+        # every position is measured for both colors
+        positions = len(boards) * len(chess.COLORS) * number
+        results[section] = {
+            name: positions / _best_time(func, number, repeat)
+            for name, func in benchmarks[section](boards)
+        }
+    return results
+
+
+def memory_per_instance(boards: List[chess.Board]) -> Dict[str, float]:
+    # bytes allocated per feature object with all of its features computed
+    # (values included)
+    result = {}
+    for feature_class in FEATURE_CLASSES:
+        for variant in (feature_class, compact_class(feature_class)):
+            result[variant.__name__] = _allocated_per_instance(
+                boards, [variant], shared_context=False
+            )
+    # every class for both colors of a position on one context, like batch
+    # extraction does; compact objects share their result stores then
+    result["all classes"] = _allocated_per_instance(
+        boards, FEATURE_CLASSES, shared_context=True
+    )
+    result["all compact classes"] = _allocated_per_instance(
+        boards, [compact_class(c) for c in FEATURE_CLASSES],
+        shared_context=True
+    )
+    return result
+
+
+def _allocated_per_instance(boards: List[chess.Board],
+                            variants: Sequence[type],
+                            shared_context: bool) -> float:
+    cache.clear()
+    gc.collect()
+    tracemalloc.start()
+    instances = []
+    for board in boards:
+        context = PositionContext(board) if shared_context else None
+        for color in chess.COLORS:
+            for variant in variants:
+                instance = variant(board, color, context)
+                for name in class_features(variant):
+                    getattr(instance, name)
+                instances.append(instance)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return allocated / len(instances)
+
+
+def compare(results: Results, baseline: Results,
+            tolerance: float = 0.2) -> List[Tuple[str, str, float, float]]:
+    # benchmarks slower (or bigger, for memory and imports) than the baseline
+    # by more than `tolerance`, as (section, name, baseline, current)
+    regressions = []
+    for section, values in results.items():
+        for name, value in values.items():
+            old = baseline.get(section, {}).get(name)
+            if old is None:
+                continue
+            if section in LOWER_IS_BETTER:
+                regressed = value > old * (1 + tolerance)
+            else:
+                regressed = value < old * (1 - tolerance)
+            if regressed:
+                regressions.append((section, name, old, value))
+    return regressions
+
+
+def format_results(results: Results) -> str:
+    lines = []
+    for section, values in results.items():
+        lines.append(f"{section} ({UNITS[section]})")
+        width = max(len(name) for name in values)
+        lines.extend(
+            f"  {name:<{width}}  {value:12.1f}" for name, value in
+            values.items()
+        )
+    return "\n".join(lines)
+
+
+def _best_time(func: Callable[[], None], number: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        # pawn structures are cached between positions - start cold
+        cache.clear()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _feature_benchmarks(boards: List[chess.Board]) \
+        -> List[Tuple[str, Callable[[], None]]]:
+    # each feature alone on fresh objects, shared work included
+    def bench(name: str) -> Callable[[], None]:
+        spec = REGISTRY[name]
+
+        def func() -> None:
+            for board in boards:
+                for color in chess.COLORS:
+                    spec.function(spec.feature_class(board, color))
+        return func
+
+    return [(name, bench(name)) for name in REGISTRY]
+
+
+def _class_benchmarks(boards: List[chess.Board]) \
+        -> List[Tuple[str, Callable[[], None]]]:
+    # all features of a class on one object per position and color
+    def bench(feature_class) -> Callable[[], None]:
+        names = class_features(feature_class)
+
+        def func() -> None:
+            for board in boards:
+                for color in chess.COLORS:
+                    instance = feature_class(board, color)
+                    for name in names:
+                        getattr(instance, name)
+        return func
+
+    return [
+        (variant.__name__, bench(variant))
+        for feature_class in FEATURE_CLASSES
+        for variant in (feature_class, compact_class(feature_class))
+    ]
+
+
+def _extraction_benchmarks(boards: List[chess.Board]) \
+        -> List[Tuple[str, Callable[[], None]]]:
+    extractor = FeatureExtractor()
+
+    def batch() -> None:
+        for color in chess.COLORS:
+            extract(boards, color)
+
+    def both_colors() -> None:
+        extractor.extract_many(boards)
+
+    return [
+        ("batch.extract", batch),
+        ("FeatureExtractor", both_colors),
+    ]
+
+
+def _parsing_benchmarks(boards: List[chess.Board]) \
+        -> List[Tuple[str, Callable[[], None]]]:
+    # input positions from FENs and from packed records (chevy.encoding)
+    fens = [board.fen() for board in boards]
+    records = encode_many(boards)
+
+    # twice, as every other benchmark measures both colors
+    def fen() -> None:
+        for _ in chess.COLORS:
+            for f in fens:
+                chess.Board(f)
+
+    def packed() -> None:
+        for _ in chess.COLORS:
+            decode_many(records)
+
+    def bitboards() -> None:
+        for _ in chess.COLORS:
+            from_records(records)
+
+    return [
+        ("chess.Board(fen)", fen),
+        ("decode_many", packed),
+        ("vectorized.from_records", bitboards),
+    ]
+
+
+def selected_sections(sections: Optional[Sequence[str]]) -> List[str]:
+    if sections is None:
+        return list(SECTIONS)
+    unknown = [s for s in sections if s not in SECTIONS]
+    if unknown:
+        raise ValueError(f"unknown sections: {', '.join(unknown)}")
+    return list(sections)
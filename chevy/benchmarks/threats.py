@@ -0,0 +1,89 @@
+from __future__ import annotations
+import argparse
+import timeit
+from typing import List, Optional, Sequence
+
+import chess
+
+from chevy.features import BoardFeatures
+
+# busy middlegames (many legal moves, checks available) and a few positions
+# with mates and stalemates on the board
+FENS = [
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+    "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
+    "5kr1/4pp1p/1Q2q3/1PBP2p1/2P3P1/p7/4P3/1R2K1B1 w - - 0 19",
+    "7k/5Q2/6K1/8/8/8/8/8 w - - 0 1",
+    "k7/8/1QK5/8/8/8/8/8 w - - 0 1",
+]
+
+
+def threats_vector_reference(board: chess.Board,
+                             color: chess.Color) -> List[int]:
+    # threats_vector as implemented before push/pop on a single board
+    result_vector_checks = [0] * len(chess.PIECE_TYPES)
+    result_vector_checkmates = [0] * len(chess.PIECE_TYPES)
+    result_vector_stalemates = [0] * len(chess.PIECE_TYPES)
+    original = board
+    if board.turn != color:
+        if not board.is_check():
+            board = board.copy()
+            board.turn = not board.turn
+        else:
+            return (
+                    result_vector_checks + result_vector_checkmates +
+                    result_vector_stalemates
+            )
+    for m in board.legal_moves:
+        b_c = board.copy()
+        b_c.push(m)
+        p = original.piece_type_at(m.from_square)
+        if p is None:
+            continue
+        result_vector_checks[p - 1] += b_c.is_check()
+        result_vector_checkmates[p - 1] += b_c.is_checkmate()
+        result_vector_stalemates[p - 1] += b_c.is_stalemate()
+
+    return (
+            result_vector_checks + result_vector_checkmates +
+            result_vector_stalemates
+    )
+
+
+def run(fens: Sequence[str] = FENS, number: int = 20) -> None:
+    boards = [chess.Board(fen) for fen in fens]
+
+    def reference() -> None:
+        for board in boards:
+            for color in chess.COLORS:
+                threats_vector_reference(board, color)
+
+    def current() -> None:
+        for board in boards:
+            for color in chess.COLORS:
+                BoardFeatures(board, color).threats_vector
+
+    positions = number * len(boards) * len(chess.COLORS)
+    reference_time = min(timeit.repeat(reference, number=number, repeat=3))
+    current_time = min(timeit.repeat(current, number=number, repeat=3))
+    print(f"reference: {positions / reference_time:10.1f} positions/s")
+    print(f"current:   {positions / current_time:10.1f} positions/s")
+    print(f"speedup:   {reference_time / current_time:10.2f}x")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m chevy.benchmarks.threats",
+        description="Compare threats_vector against the copy-per-move "
+                    "reference implementation."
+    )
+    parser.add_argument("--number", type=int, default=20,
+                        help="passes over the positions per measurement")
+    main_args = parser.parse_args(argv)
+    run(number=main_args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+import sys
+from typing import List
+
+import chess
+
+BB_NOT_FILE_A = chess.BB_ALL & ~chess.BB_FILE_A
+BB_NOT_FILE_H = chess.BB_ALL & ~chess.BB_FILE_H
+BB_BACKRANKS = chess.BB_RANK_1 | chess.BB_RANK_8
+BB_CENTER = chess.BB_D4 | chess.BB_E4 | chess.BB_D5 | chess.BB_E5
+
+# files next to the given file
+BB_ADJACENT_FILES: List[chess.Bitboard] = [
+    (chess.BB_FILES[f - 1] if f > 0 else 0) |
+    (chess.BB_FILES[f + 1] if f < 7 else 0)
+    for f in range(8)
+]
+
+# 3 for the edge of the board, 0 for the central squares
+CENTRALITY: List[int] = [
+    3 - min(7 - (sq // 8), sq // 8, 7 - sq % 8, sq % 8)
+    for sq in chess.SQUARES
+]
+
+# [rank, file] offsets of squares around the king
+KING_PROXIMITY_OFFSET_RING_1 = [
+    [1, 0], [1, -1], [1, 1], [-1, -1],
+    [-1, 0], [-1, 1], [0, 1], [0, -1]
+]
+
+KING_PROXIMITY_OFFSET_RING_2 = [
+    [2, -2], [2, -1], [1, 2], [2, 1], [-2, -2], [-2, -1], [-1, -2], [-2, 1],
+    [2, 0], [1, -2], [-1, 2], [-2, 0], [0, 2], [2, 2], [-2, 2], [0, -2]
+]
+
+
+def _king_ring(square: chess.Square, offsets: List[List[int]]) \
+        -> chess.Bitboard:
+    x, y = square // 8, square % 8
+    mask = 0
+    for a, b in offsets:
+        if (8 > x + a >= 0) and (0 <= y + b < 8):
+            mask |= chess.BB_SQUARES[(x + a) * 8 + y + b]
+    return mask
+
+
+# rings of squares around a king standing on the given square
+BB_KING_RING_1: List[chess.Bitboard] = [
+    _king_ring(sq, KING_PROXIMITY_OFFSET_RING_1) for sq in chess.SQUARES
+]
+BB_KING_RING_2: List[chess.Bitboard] = [
+    _king_ring(sq, KING_PROXIMITY_OFFSET_RING_2) for sq in chess.SQUARES
+]
+
+if sys.version_info >= (3, 10):
+    def popcount(mask: chess.Bitboard) -> int:
+        return mask.bit_count()
+else:
+    _POPCOUNT_16 = bytearray(1 << 16)
+    for _i in range(1, 1 << 16):
+        _POPCOUNT_16[_i] = _POPCOUNT_16[_i >> 1] + (_i & 1)
+
+    def popcount(mask: chess.Bitboard) -> int:
+        return (
+                _POPCOUNT_16[mask & 0xFFFF] +
+                _POPCOUNT_16[mask >> 16 & 0xFFFF] +
+                _POPCOUNT_16[mask >> 32 & 0xFFFF] +
+                _POPCOUNT_16[mask >> 48]
+        )
+
+
+def popcount_array(masks):
+    # element-wise popcount of an uint64 array, returned as uint8
+    import numpy as np
+
+    masks = np.asarray(masks, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks)
+    x = masks - ((masks >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + \
+        ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((x * np.uint64(0x0101010101010101)) >>
+            np.uint64(56)).astype(np.uint8)
+
+
+def north_fill(mask: chess.Bitboard) -> chess.Bitboard:
+    mask |= mask << 8
+    mask |= mask << 16
+    mask |= mask << 32
+    return mask & chess.BB_ALL
+
+
+def south_fill(mask: chess.Bitboard) -> chess.Bitboard:
+    mask |= mask >> 8
+    mask |= mask >> 16
+    mask |= mask >> 32
+    return mask
+
+
+def adjacent_squares(mask: chess.Bitboard) -> chess.Bitboard:
+    # squares a king step away from any square of the mask (mask included)
+    mask |= (mask << 8 & chess.BB_ALL) | (mask >> 8)
+    return mask | (mask << 1 & BB_NOT_FILE_A) | (mask >> 1 & BB_NOT_FILE_H)
+
+
+def attackers_mask(board: chess.Board, color: chess.Color,
+                   square: chess.Square,
+                   occupied: chess.Bitboard) -> chess.Bitboard:
+    # chess.Board.attackers_mask with custom occupancy (for x-ray attacks)
+    queens_and_rooks = board.queens | board.rooks
+    queens_and_bishops = board.queens | board.bishops
+    attackers = (
+            (chess.BB_KING_ATTACKS[square] & board.kings) |
+            (chess.BB_KNIGHT_ATTACKS[square] & board.knights) |
+            (chess.BB_RANK_ATTACKS[square][
+                 chess.BB_RANK_MASKS[square] & occupied] & queens_and_rooks) |
+            (chess.BB_FILE_ATTACKS[square][
+                 chess.BB_FILE_MASKS[square] & occupied] & queens_and_rooks) |
+            (chess.BB_DIAG_ATTACKS[square][
+                 chess.BB_DIAG_MASKS[square] & occupied] &
+             queens_and_bishops) |
+            (chess.BB_PAWN_ATTACKS[not color][square] & board.pawns)
+    )
+    return attackers & board.occupied_co[color]
@@ -0,0 +1,120 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, \
+    TYPE_CHECKING
+
+import chess
+
+if TYPE_CHECKING:
+    from cachetools import Cache
+
+DEFAULT_POSITION_CACHE_SIZE = 2 ** 16
+DEFAULT_PAWN_CACHE_SIZE = 2 ** 16
+
+# eviction policy -> cachetools class name (cachetools is imported when the
+# first cache is used)
+EVICTION_POLICIES: Dict[str, str] = {
+    "lru": "LRUCache",
+    "lfu": "LFUCache",
+    "fifo": "FIFOCache",
+    "random": "RRCache",
+}
+
+
+class FeatureCache:
+
+    def __init__(self, maxsize: int, eviction: str = "lru"):
+        _check_eviction(eviction)
+        self.eviction = eviction
+        self._maxsize = maxsize
+        # created on first use
+        self._cache: Optional[Cache] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        cache = self._cache
+        if cache is None:
+            cache = self._cache = _make_cache(self._maxsize, self.eviction)
+        try:
+            value = cache[key]
+        except KeyError:
+            self.misses += 1
+            value = cache[key] = compute()
+        else:
+            self.hits += 1
+        return value
+
+    def clear(self) -> None:
+        if self._cache is not None:
+            self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def resize(self, maxsize: int, eviction: Optional[str] = None) -> None:
+        eviction = eviction or self.eviction
+        _check_eviction(eviction)
+        self.eviction = eviction
+        self._maxsize = maxsize
+        self._cache = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    def info(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": 0 if self._cache is None else len(self._cache),
+            "maxsize": self.maxsize,
+        }
+
+
+def _check_eviction(eviction: str) -> None:
+    if eviction not in EVICTION_POLICIES:
+        raise ValueError(f"unknown eviction policy: {eviction}")
+
+
+def _make_cache(maxsize: int, eviction: str) -> Cache:
+    import cachetools
+
+    return getattr(cachetools, EVICTION_POLICIES[eviction])(maxsize=maxsize)
+
+
+# feature rows of chevy.batch.extract(cache=True), keyed by position_key()
+position_cache = FeatureCache(DEFAULT_POSITION_CACHE_SIZE)
+pawn_cache = FeatureCache(DEFAULT_PAWN_CACHE_SIZE)
+
+
+def position_key(board: chess.Board, color: chess.Color) -> Tuple[int, bool]:
+    import chess.polyglot
+
+    return chess.polyglot.zobrist_hash(board), color
+
+
+def pawn_key(board: chess.Board) -> Tuple[chess.Bitboard, chess.Bitboard]:
+    return (
+        board.pawns & board.occupied_co[chess.WHITE],
+        board.pawns & board.occupied_co[chess.BLACK],
+    )
+
+
+def configure(position_cache_size: int = DEFAULT_POSITION_CACHE_SIZE,
+              pawn_cache_size: int = DEFAULT_PAWN_CACHE_SIZE,
+              pawn_cache_eviction: str = "lru") -> None:
+    position_cache.resize(position_cache_size)
+    pawn_cache.resize(pawn_cache_size, pawn_cache_eviction)
+
+
+def cache_info() -> Dict[str, Dict[str, int]]:
+    return {
+        "positions": position_cache.info(),
+        "pawns": pawn_cache.info(),
+    }
+
+
+def clear() -> None:
+    position_cache.clear()
+    pawn_cache.clear()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Optional, Type, TypeVar, cast
+
+import chess
+
+from chevy.context import MISSING, PositionContext
+from chevy.features import BoardFeaturesBase, BoardFeatures, KingSafety, \
+    PawnStructure
+
+T = TypeVar("T", bound=BoardFeaturesBase)
+
+# cached_property function -> index in result stores; properties inherited
+# from a common base share their entry, so they are computed once per
+# position and color whichever compact class asks first; the properties a
+# class adds get the next free range, so stores only grow up to the end of
+# the ranges of the classes using them
+_STORE_INDEX: Dict[Callable[[Any], Any], int] = {}
+
+
+class _StoredProperty:
+    __slots__ = ("func", "index", "__doc__")
+
+    def __init__(self, func: Callable[[Any], Any], index: int):
+        self.func = func
+        self.index = index
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        values = instance._values
+        value = values[self.index]
+        if value is MISSING:
+            value = values[self.index] = self.func(instance)
+        return value
+
+    def __set__(self, instance, value) -> None:
+        instance._values[self.index] = value
+
+    def is_cached(self, instance) -> bool:
+        return instance._values[self.index] is not MISSING
+
+
+def compact_class(feature_class: Type[T]) -> Type[T]:
+    # subclass of `feature_class` without per-instance attribute dicts:
+    # every cached_property is read from and written to a list shared by all
+    # compact objects of the same position and color (see
+    # PositionContext.result_store)
+    try:
+        return cast(Type[T], _COMPACT_CLASSES[feature_class])
+    except KeyError:
+        pass
+
+    properties = {}
+    for klass in reversed(feature_class.__mro__):
+        for name, attribute in vars(klass).items():
+            if isinstance(attribute, cached_property):
+                properties[name] = attribute.func
+
+    def __init__(self, board: chess.Board, color: chess.Color = chess.WHITE,
+                 context: Optional[PositionContext] = None) -> None:
+        if context is None:
+            context = PositionContext(board)
+        self._values = context.result_store(color, size)
+        feature_class.__init__(self, board, color, context)
+
+    namespace: Dict[str, Any] = {"__slots__": ("_values",),
+                                 "__init__": __init__}
+    size = 0
+    for name, func in properties.items():
+        index = _STORE_INDEX.setdefault(func, len(_STORE_INDEX))
+        namespace[name] = _StoredProperty(func, index)
+        size = max(size, index + 1)
+
+    compact = type(f"Compact{feature_class.__name__}", (feature_class,),
+                   namespace)
+    _COMPACT_CLASSES[feature_class] = compact
+    return cast(Type[T], compact)
+
+
+_COMPACT_CLASSES: Dict[type, type] = {}
+
+CompactBoardFeatures = compact_class(BoardFeatures)
+CompactKingSafety = compact_class(KingSafety)
+CompactPawnStructure = compact_class(PawnStructure)
+
+COMPACT_CLASSES: List[Type[BoardFeaturesBase]] = [
+    CompactBoardFeatures, CompactKingSafety, CompactPawnStructure,
+]
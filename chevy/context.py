@@ -0,0 +1,115 @@
+from __future__ import annotations
+from functools import cached_property
+from typing import Any, Collection, Dict, List, Optional, Set, Tuple
+
+import chess
+
+from chevy.bitboard import popcount
+from chevy.mobility import mobility_masks, mobility_counts
+
+# marks empty entries of result stores
+MISSING = object()
+
+
+class PositionContext:
+    # per-position data shared by all feature objects (of both colors) built
+    # for the same board - everything is computed lazily, at most once
+
+    def __init__(self, board: chess.Board):
+        self.board = board
+        self._mobility_masks: Dict[chess.Color,
+                                   Dict[chess.Square, chess.Bitboard]] = {}
+        self._mobility_counts: Dict[chess.Color, Dict[chess.Square, int]] = {}
+        self._mobility_types: Dict[chess.Color, Set[chess.PieceType]] = {}
+        self._result_stores: Dict[chess.Color, List[Any]] = {}
+
+    @cached_property
+    def attacks(self) -> Dict[chess.Square, chess.Bitboard]:
+        # attack mask of every piece on the board
+        board = self.board
+        return {
+            sq: board.attacks_mask(sq)
+            for sq in chess.scan_reversed(board.occupied)
+        }
+
+    @cached_property
+    def piece_types(self) -> Dict[chess.Square, chess.PieceType]:
+        return {
+            sq: piece_type
+            for (piece_type, _), mask in self.pieces.items()
+            for sq in chess.scan_reversed(mask)
+        }
+
+    @cached_property
+    def pieces(self) -> Dict[Tuple[chess.PieceType, chess.Color],
+                             chess.Bitboard]:
+        return {
+            (piece_type, color): self.board.pieces_mask(piece_type, color)
+            for color in chess.COLORS
+            for piece_type in chess.PIECE_TYPES
+        }
+
+    @cached_property
+    def kings(self) -> Dict[chess.Color, Optional[chess.Square]]:
+        return {color: self.board.king(color) for color in chess.COLORS}
+
+    @cached_property
+    def pinned(self) -> Dict[chess.Color, chess.Bitboard]:
+        # pieces of each color that are the only piece between their king and
+        # an enemy slider (same as chess.Board.is_pinned)
+        board = self.board
+        result = {}
+        for color in chess.COLORS:
+            king = self.kings[color]
+            mask = 0
+            if king is not None:
+                snipers = (
+                        (chess.BB_RANK_ATTACKS[king][0] |
+                         chess.BB_FILE_ATTACKS[king][0]) &
+                        (board.rooks | board.queens) |
+                        chess.BB_DIAG_ATTACKS[king][0] &
+                        (board.bishops | board.queens)
+                ) & board.occupied_co[not color]
+                for sniper in chess.scan_reversed(snipers):
+                    blockers = chess.between(king, sniper) & board.occupied
+                    if popcount(blockers) == 1:
+                        mask |= blockers
+            result[color] = mask & board.occupied_co[color]
+        return result
+
+    def result_store(self, color: chess.Color, size: int) -> List[Any]:
+        # preallocated slots for values of compact feature objects of a color
+        store = self._result_stores.get(color)
+        if store is None:
+            store = self._result_stores[color] = [MISSING] * size
+        elif len(store) < size:
+            store.extend([MISSING] * (size - len(store)))
+        return store
+
+    def mobility_masks(
+            self, color: chess.Color,
+            piece_types: Collection[chess.PieceType] = chess.PIECE_TYPES
+    ) -> Dict[chess.Square, chess.Bitboard]:
+        # moves are generated per piece type on first request - the result
+        # may hold pieces of other types requested earlier
+        self._generate_mobility(color, piece_types)
+        return self._mobility_masks[color]
+
+    def mobility_counts(
+            self, color: chess.Color,
+            piece_types: Collection[chess.PieceType] = chess.PIECE_TYPES
+    ) -> Dict[chess.Square, int]:
+        self._generate_mobility(color, piece_types)
+        return self._mobility_counts[color]
+
+    def _generate_mobility(self, color: chess.Color,
+                           piece_types: Collection[chess.PieceType]) -> None:
+        done = self._mobility_types.setdefault(color, set())
+        missing = [t for t in piece_types if t not in done]
+        masks = self._mobility_masks.setdefault(color, {})
+        counts = self._mobility_counts.setdefault(color, {})
+        if missing:
+            new_masks = mobility_masks(self.board, color, missing)
+            masks.update(new_masks)
+            counts.update(mobility_counts(self.board, color, new_masks))
+            done.update(missing)
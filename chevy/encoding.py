@@ -0,0 +1,196 @@
+from __future__ import annotations
+import os
+from typing import Iterable, List, Union
+
+import chess
+import numpy as np
+
+# a position packed into 32 bytes:
+#   occupied - occupancy mask
+#   pieces - a 4 bit code (see PIECE_CODES) for every occupied square, in
+#            square order, two per byte starting with the low nibble
+#   turn - 1 for white to move
+#   castling - rook files with castling rights, white then black
+#   ep_square - en passant square if en passant is legal, NO_EP otherwise
+RECORD_DTYPE = np.dtype([
+    ("occupied", "<u8"),
+    ("pieces", "u1", (16,)),
+    ("turn", "u1"),
+    ("castling", "u1", (2,)),
+    ("ep_square", "u1"),
+    ("halfmove_clock", "<u2"),
+    ("fullmove_number", "<u2"),
+])
+RECORD_SIZE = RECORD_DTYPE.itemsize
+NO_EP = 255
+MAX_PIECES = 32
+
+# (color, piece type) -> code; 0 marks unused nibbles
+PIECE_CODES = {
+    (color, piece_type): i * len(chess.PIECE_TYPES) + piece_type
+    for i, color in enumerate((chess.WHITE, chess.BLACK))
+    for piece_type in chess.PIECE_TYPES
+}
+# columns of piece_masks(): white pawn ... king, then black
+MASK_COLUMNS = len(PIECE_CODES)
+
+_SQUARES = np.arange(64, dtype=np.uint64)
+_ONE = np.uint64(1)
+
+
+def encode_many(boards: Iterable[chess.Board]) -> np.ndarray:
+    # boards as a (n,) array of RECORD_DTYPE; `.tobytes()` / np.frombuffer
+    # (or np.fromfile, np.memmap) convert to and from raw bytes; the move
+    # stack and promoted pieces are not kept
+    boards = list(boards)
+    masks = np.array([
+        [
+            board.pieces_mask(piece_type, color)
+            for color, piece_type in PIECE_CODES
+        ]
+        for board in boards
+    ], dtype=np.uint64).reshape(-1, MASK_COLUMNS)
+    records = np.zeros(len(boards), dtype=RECORD_DTYPE)
+    records["occupied"] = np.bitwise_or.reduce(masks, axis=1)
+    records["pieces"] = _pack_pieces(masks)
+
+    castling = []
+    ep_squares = []
+    for board in boards:
+        rights = board.clean_castling_rights()
+        castling.append((rights & chess.BB_RANK_1,
+                         (rights & chess.BB_RANK_8) >> 56))
+        ep_squares.append(
+            board.ep_square if board.has_legal_en_passant() else NO_EP
+        )
+    records["turn"] = [board.turn for board in boards]
+    records["castling"] = np.array(castling, dtype=np.uint8) \
+        .reshape(-1, len(chess.COLORS))
+    records["ep_square"] = ep_squares
+    records["halfmove_clock"] = [board.halfmove_clock for board in boards]
+    records["fullmove_number"] = [board.fullmove_number for board in boards]
+    return records
+
+
+def decode_many(records: np.ndarray) -> List[chess.Board]:
+    records = as_records(records)
+    masks = piece_masks(records).tolist()
+    castling = castling_rights(records).tolist()
+    boards = []
+    for row, rights, turn, ep_square, halfmove_clock, fullmove_number in zip(
+            masks, castling, records["turn"].tolist(),
+            records["ep_square"].tolist(), records["halfmove_clock"].tolist(),
+            records["fullmove_number"].tolist()):
+        # setting the masks directly is much cheaper than parsing a FEN
+        board = chess.Board(None)
+        (board.pawns, board.knights, board.bishops, board.rooks,
+         board.queens, board.kings) = (
+            white | black for white, black in zip(row[:6], row[6:])
+        )
+        board.occupied_co[chess.WHITE] = white = _union(row[:6])
+        board.occupied_co[chess.BLACK] = black = _union(row[6:])
+        board.occupied = white | black
+        board.turn = bool(turn)
+        board.castling_rights = rights
+        board.ep_square = None if ep_square == NO_EP else ep_square
+        board.halfmove_clock = halfmove_clock
+        board.fullmove_number = fullmove_number
+        board.chess960 = board.has_chess960_castling_rights()
+        boards.append(board)
+    return boards
+
+
+def encode(board: chess.Board) -> bytes:
+    return encode_many([board]).tobytes()
+
+
+def decode(data: bytes) -> chess.Board:
+    if len(data) != RECORD_SIZE:
+        raise ValueError(f"expected {RECORD_SIZE} bytes, got {len(data)}")
+    return decode_many(np.frombuffer(data, dtype=RECORD_DTYPE))[0]
+
+
+def save_positions(path: str, boards: Iterable[chess.Board],
+                   append: bool = False) -> int:
+    # raw records, RECORD_SIZE bytes per position; returns the number written
+    records = encode_many(boards)
+    with open(path, "ab" if append else "wb") as f:
+        f.write(records.tobytes())
+    return len(records)
+
+
+def load_positions(path: str, mmap: bool = True) -> np.ndarray:
+    # records of a file written by save_positions, backed by the file unless
+    # `mmap` is False
+    if mmap and os.path.getsize(path) >= RECORD_SIZE:
+        return np.memmap(path, dtype=RECORD_DTYPE, mode="r")
+    return np.fromfile(path, dtype=RECORD_DTYPE)
+
+
+def as_records(data: Union[np.ndarray, bytes]) -> np.ndarray:
+    # RECORD_DTYPE view of records, raw bytes or (n, RECORD_SIZE) uint8
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return np.frombuffer(data, dtype=RECORD_DTYPE)
+    data = np.asarray(data)
+    if data.dtype == RECORD_DTYPE:
+        return data.reshape(-1)
+    if data.dtype == np.uint8 and data.ndim == 2 and \
+            data.shape[1] == RECORD_SIZE:
+        return np.ascontiguousarray(data).view(RECORD_DTYPE).reshape(-1)
+    raise ValueError(f"not encoded positions: {data.dtype}, {data.shape}")
+
+
+def is_records(data) -> bool:
+    return isinstance(data, np.ndarray) and data.dtype == RECORD_DTYPE
+
+
+def piece_masks(records: np.ndarray) -> np.ndarray:
+    # (n, MASK_COLUMNS) uint64 masks in PIECE_CODES order, without creating
+    # boards
+    records = as_records(records)
+    pieces = records["pieces"]
+    nibbles = np.empty((len(records), MAX_PIECES), dtype=np.uint8)
+    nibbles[:, 0::2] = pieces & 0x0F
+    nibbles[:, 1::2] = pieces >> 4
+
+    occupied = ((records["occupied"][:, None] >> _SQUARES) & _ONE) \
+        .astype(bool)
+    counts = occupied.sum(axis=1)
+    if (counts > MAX_PIECES).any() or (nibbles > MASK_COLUMNS).any() or \
+            ((nibbles != 0).sum(axis=1) != counts).any():
+        raise ValueError("corrupt encoded positions")
+    # the code of the k-th occupied square is the k-th nibble
+    index = np.clip(np.cumsum(occupied, axis=1) - 1, 0, MAX_PIECES - 1)
+    codes = np.where(occupied, np.take_along_axis(nibbles, index, axis=1), 0)
+
+    masks = np.empty((len(records), MASK_COLUMNS), dtype=np.uint64)
+    for code in range(1, MASK_COLUMNS + 1):
+        bits = np.packbits(codes == code, axis=1, bitorder="little")
+        masks[:, code - 1] = bits.view("<u8").reshape(-1)
+    return masks
+
+
+def castling_rights(records: np.ndarray) -> np.ndarray:
+    # (n,) uint64 castling rights masks (rook squares)
+    castling = as_records(records)["castling"].astype(np.uint64)
+    return castling[:, 0] | (castling[:, 1] << np.uint64(56))
+
+
+def _pack_pieces(masks: np.ndarray) -> np.ndarray:
+    codes = np.zeros((len(masks), 64), dtype=np.uint8)
+    for column in range(MASK_COLUMNS):
+        codes |= (((masks[:, column, None] >> _SQUARES) & _ONE)
+                  .astype(np.uint8) * np.uint8(column + 1))
+    if ((codes != 0).sum(axis=1) > MAX_PIECES).any():
+        raise ValueError(f"more than {MAX_PIECES} pieces on a board")
+    # codes of occupied squares first, in square order
+    order = np.argsort(codes == 0, axis=1, kind="stable")[:, :MAX_PIECES]
+    packed = np.take_along_axis(codes, order, axis=1)
+    return packed[:, 0::2] | (packed[:, 1::2] << 4)
+
+
+def _union(masks: List[int]) -> int:
+    result = 0
+    for mask in masks:
+        result |= mask
+    return result
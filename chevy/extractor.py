@@ -0,0 +1,69 @@
+from __future__ import annotations
+from typing import Iterable, List, Optional, Sequence, Union
+
+import chess
+import numpy as np
+
+from chevy.batch import _fill_row, _plan
+from chevy.context import PositionContext
+from chevy.encoding import decode, decode_many, is_records
+from chevy.registry import FeaturePlan, plan
+from chevy.schema import feature_names, layout
+
+# column blocks of an extracted vector, in order
+COLOR_PREFIXES = ((chess.WHITE, "white"), (chess.BLACK, "black"))
+
+
+class FeatureExtractor:
+    # features of both colors as one flat vector: the columns of
+    # chevy.batch.schema(features) for white, prefixed with "white_",
+    # followed by the same columns for black, prefixed with "black_"; missing
+    # values are set to the schema fill values unless `fill_value` is given
+
+    def __init__(self, features: Optional[Sequence[str]] = None,
+                 dtype=np.int16, fill_value: Optional[int] = None):
+        self.features = feature_names(features)
+        self.dtype = dtype
+        # resources and cost class the requested features need
+        self.plan: FeaturePlan = plan(self.features)
+        color_layout = layout(self.features, fill_value)
+        self._groups = _plan(color_layout)
+        self._width = len(color_layout.columns)
+        self._fill_values = np.array(color_layout.fill_values * 2,
+                                     dtype=dtype)
+        self.columns: List[str] = [
+            f"{prefix}_{column}"
+            for _, prefix in COLOR_PREFIXES
+            for column in color_layout.columns
+        ]
+
+    def extract(self, board: Union[chess.Board, str, bytes],
+                out: Optional[np.ndarray] = None) -> np.ndarray:
+        # bytes are positions packed with chevy.encoding.encode
+        if isinstance(board, str):
+            board = chess.Board(board)
+        elif isinstance(board, bytes):
+            board = decode(board)
+        if out is None:
+            out = np.empty(len(self.columns), dtype=self.dtype)
+        out[:] = self._fill_values
+
+        # attacks, pins and mobility are computed once for both colors
+        context = PositionContext(board)
+        for i, (color, _) in enumerate(COLOR_PREFIXES):
+            _fill_row(out[i * self._width:(i + 1) * self._width], board,
+                      color, self._groups, context)
+        return out
+
+    def extract_many(self, boards: Union[Iterable[Union[chess.Board, str,
+                                                           bytes]],
+                                         np.ndarray]) -> np.ndarray:
+        # also takes an array of positions from chevy.encoding.encode_many
+        if isinstance(boards, np.ndarray) and is_records(boards):
+            boards = decode_many(boards)
+        elif not isinstance(boards, Sequence):
+            boards = list(boards)
+        out = np.empty((len(boards), len(self.columns)), dtype=self.dtype)
+        for row, board in zip(out, boards):
+            self.extract(board, out=row)
+        return out
@@ -1,25 +1,80 @@
 from __future__ import annotations
-import operator
 from functools import cached_property
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, NamedTuple, Tuple, Optional, Sequence, Type, \
+    TypeVar
 
 import chess
-import chess.pgn
-import numpy as np
-from cachetools import cachedmethod, LRUCache
-from scipy.ndimage import label
 
-from chevy.utils import count_bits
+from chevy import bitboard, cache, pawns, schema, threats
+from chevy.bitboard import BB_BACKRANKS, BB_CENTER, CENTRALITY, popcount
+from chevy.context import PositionContext
+
+T = TypeVar("T", bound="BoardFeaturesBase")
+
+
+class RingFeatures(NamedTuple):
+    attackers_looking_at_ring: List[int]
+    defenders_looking_at_ring: List[int]
+    attackers_at_ring: List[int]
+    defenders_at_ring: List[int]
 
 
 class BoardFeaturesBase:
+    # cached_property values go to __dict__, compact subclasses (see
+    # chevy.compact) keep them in a per-position result store instead
+    __slots__ = ("board", "color", "context", "__dict__")
+
     CENTRAL_SQUARES = {
         27, 28, 35, 36
     }
 
-    def __init__(self, board: chess.Board, color: chess.Color = chess.WHITE):
+    def __init__(self, board: chess.Board, color: chess.Color = chess.WHITE,
+                 context: Optional[PositionContext] = None):
         self.board = board
         self.color = color
+        # pass the same context to every feature object of a position to
+        # share attack masks, pins and mobility between them
+        self.context = context if context is not None else \
+            PositionContext(board)
+
+    @classmethod
+    def from_encoded(cls: Type[T], data: bytes,
+                     color: chess.Color = chess.WHITE,
+                     context: Optional[PositionContext] = None) -> T:
+        # position packed with chevy.encoding.encode
+        from chevy.encoding import decode
+
+        return cls(decode(data), color, context)
+
+    @classmethod
+    def columns(cls, features: Optional[Sequence[str]] = None) -> List[str]:
+        return schema.columns(cls._schema_features(features))
+
+    def to_array(self, out=None, features: Optional[Sequence[str]] = None,
+                 fill_value: Optional[int] = None):
+        # features of this class (all by default) written straight into `out`
+        # (a 1d array or a row view), laid out as in `columns`
+        row_layout = schema.layout(self._schema_features(features),
+                                   fill_value)
+        if out is None:
+            out = schema.empty_row(row_layout)
+        out[:] = row_layout.fill_values
+        for name, offset, _ in row_layout.offsets:
+            schema.write(out, offset, name, getattr(self, name))
+        return out
+
+    @classmethod
+    def _schema_features(cls, features: Optional[Sequence[str]]) \
+            -> Sequence[str]:
+        own = schema.class_features(cls)
+        if features is None:
+            return own
+        foreign = [f for f in features if f not in own]
+        if foreign:
+            raise ValueError(
+                f"not features of {cls.__name__}: {', '.join(foreign)}"
+            )
+        return features
 
     @cached_property
     def our_attacks_map(self) -> Dict[chess.PieceType, List[int]]:
@@ -30,45 +85,37 @@ class BoardFeaturesBase:
                  enumerate(chess.PIECE_TYPES)]
             )
         )
-        for p in self._all_our_pieces_square_set:
-            for attacked_piece in self.board.attacks(p).intersection(
-                    self._all_their_pieces_square_set):
-                attacked_piece_idx = self.board.piece_at(
-                    attacked_piece).piece_type - 1
-                attacking_piece_idx = self.board.piece_at(p).piece_type
-                attacks[attacking_piece_idx][attacked_piece_idx] += 1
+        piece_types = self.context.piece_types
+        their_pieces = self.board.occupied_co[not self.color]
+        for p in chess.scan_reversed(self.board.occupied_co[self.color]):
+            attacking = attacks[piece_types[p]]
+            for attacked_piece in chess.scan_reversed(
+                    self.context.attacks[p] & their_pieces):
+                attacking[piece_types[attacked_piece] - 1] += 1
         return attacks
 
     @cached_property
-    def mobility_map(self) -> Dict[chess.Square, List[chess.Square]]:
-        board = self.board.copy()
-        # hack to overcome no legal moves when in check
-        # we remove our king from board to eliminate effect of
-        # potential opponents checks, instead we place a pawn on that square
-        # so it still blocks movement of our pieces
-
-        our_king = board.king(self.color)
-        board.remove_piece_at(our_king)
-        board.set_piece_at(our_king, chess.Piece(chess.PAWN, self.color))
-        # hack to overcome no legal moves when opponent to move
-        if board.turn != self.color:
-            board.turn = not board.turn
-
-        result: dict = dict()
-        for m in list(board.legal_moves):
-            result[m.from_square] = result.get(m.from_square, list()) + (
-                [m.to_square] if m.from_square != our_king else []
-            )
+    def mobility_masks(self) -> Dict[chess.Square, chess.Bitboard]:
+        return self.context.mobility_masks(self.color)
 
-        # here we fix previously edited board - we place king on the board again
-        # and only then look at its legal moves
-        # (now any checks are again respected)
-        board.set_piece_at(our_king, chess.Piece(chess.KING, self.color))
-        result[our_king] = [
-            m.to_square for m in board.legal_moves if
-            m.from_square == our_king
-        ]
+    @cached_property
+    def mobility_counts(self) -> Dict[chess.Square, int]:
+        return self.context.mobility_counts(self.color)
 
+    @cached_property
+    def mobility_map(self) -> Dict[chess.Square, List[chess.Square]]:
+        # squares of pieces without moves are skipped (except for our king),
+        # promotions are listed once per promotion piece
+        result = dict()
+        for sq, count in self.mobility_counts.items():
+            squares = list(chess.SquareSet(self.mobility_masks[sq]))
+            if count > len(squares):
+                squares = [
+                    s for s in squares for _ in
+                    range(4 if chess.BB_SQUARES[s] & BB_BACKRANKS else 1)
+                ]
+            if squares or sq == self.board.king(self.color):
+                result[sq] = squares
         return result
 
     @cached_property
@@ -91,41 +138,28 @@ class BoardFeaturesBase:
     def _all_their_pieces_square_set(self) -> chess.SquareSet:
         return self._get_all_pieces_square_set(not self.color)
 
-    def _get_all_pieces_square_set(self, color: chess.Color) -> chess.SquareSet:
-        all_pieces = chess.SquareSet()
-        for piece in chess.PIECE_TYPES:
-            all_pieces |= self.board.pieces(
-                piece,
-                color=color
-            )
-        return all_pieces
+    def _get_all_pieces_square_set(self,
+                                   color: chess.Color) -> chess.SquareSet:
+        return chess.SquareSet(self.board.occupied_co[color])
 
     def _get_mobility_count_vector(self, piece) -> List[int]:
+        mobility_counts = self.context.mobility_counts(self.color, (piece,))
         return sorted([
-            len(self.mobility_map.get(i, list()))
+            mobility_counts.get(i, 0)
             for i in self.board.pieces(piece, color=self.color)
         ])
 
     def _are_pieces_connected(self, piece: chess.PieceType) -> bool:
-        mutual_attack_mask = chess.SquareSet()
-        for i in self.board.pieces(piece, self.color):
-            mutual_attack_mask = mutual_attack_mask.union(
-                self.board.attacks(i)
-            )
-
-        return count_bits(
-            mutual_attack_mask.intersection(
-                self.board.pieces(piece, self.color)
-            ).mask
-        ) > 1
+        pieces = self.context.pieces[piece, self.color]
+        mutual_attack_mask = 0
+        for i in chess.scan_reversed(pieces):
+            mutual_attack_mask |= self.context.attacks[i]
+        return popcount(mutual_attack_mask & pieces) > 1
 
     def _get_pieces_centrality(self, piece: chess.PieceType,
                                color: chess.Color) -> List[int]:
         return sorted([
-            3 - min(
-                7 - (p // 8), p // 8, 7 - p % 8, p % 8
-            )
-            for p in self.board.pieces(piece, color)
+            CENTRALITY[p] for p in self.board.pieces(piece, color)
         ])
 
 
@@ -212,23 +246,17 @@ class BoardFeatures(BoardFeaturesBase):
 
     @cached_property
     def connectivity(self) -> int:
-        c = 0
-        for p in self._all_our_pieces_square_set:
-            c += len(
-                self.board.attacks(p).intersection(
-                    self._all_our_pieces_square_set)
-            )
-        return c
+        our_pieces = self.board.occupied_co[self.color]
+        return sum(
+            popcount(self.context.attacks[p] & our_pieces)
+            for p in chess.scan_reversed(our_pieces)
+        )
 
     @cached_property
     def material_vector_count(self) -> List[int]:
         return [
-            count_bits(self.board.pieces(chess.PAWN, self.color).mask),
-            count_bits(self.board.pieces(chess.KNIGHT, self.color).mask),
-            count_bits(self.board.pieces(chess.BISHOP, self.color).mask),
-            count_bits(self.board.pieces(chess.ROOK, self.color).mask),
-            count_bits(self.board.pieces(chess.QUEEN, self.color).mask),
-            count_bits(self.board.pieces(chess.KING, self.color).mask),
+            popcount(self.board.pieces_mask(piece_type, self.color))
+            for piece_type in chess.PIECE_TYPES
         ]
 
     @cached_property
@@ -241,7 +269,7 @@ class BoardFeatures(BoardFeaturesBase):
 
     @cached_property
     def bishop_pair(self) -> bool:
-        return len(self.bishops_mobility) > 1
+        return popcount(self.context.pieces[chess.BISHOP, self.color]) > 1
 
     @cached_property
     def bishops_mobility(self) -> List[int]:
@@ -277,28 +305,18 @@ class BoardFeatures(BoardFeaturesBase):
 
     @cached_property
     def open_files_rooks_count(self) -> int:
-        our_pawns_files = {
-            chess.square_file(p) for p in
-            self.board.pieces(chess.PAWN, self.color)
-        }
-        their_pawns_files = {
-            chess.square_file(p) for p in
-            self.board.pieces(chess.PAWN, not self.color)
-        }
         return len([
             p for p in self.board.pieces(chess.ROOK, self.color) if
-            (chess.square_file(p) not in our_pawns_files) and
-            (chess.square_file(p) not in their_pawns_files)
+            not chess.BB_FILES[chess.square_file(p)] & self.board.pawns
         ])
 
     @cached_property
     def pins_vector(self) -> List[int]:
-        result = [0] * len(chess.PIECE_TYPES)
-        for p in self._all_our_pieces_square_set:
-            piece = self.board.piece_at(p)
-            if self.board.is_pinned(self.color, p):
-                result[piece.piece_type - 1] += 1
-        return result
+        pinned = self.context.pinned[self.color]
+        return [
+            popcount(pinned & self.context.pieces[piece_type, self.color])
+            for piece_type in chess.PIECE_TYPES
+        ]
 
     @cached_property
     def legal_moves_count(self) -> int:
@@ -306,49 +324,13 @@ class BoardFeatures(BoardFeaturesBase):
 
     @cached_property
     def threats_vector(self) -> List[int]:
-        result_vector_checks = [0] * len(chess.PIECE_TYPES)
-        result_vector_checkmates = [0] * len(chess.PIECE_TYPES)
-        result_vector_stalemates = [0] * len(chess.PIECE_TYPES)
-        board = self.board
-        if self.board.turn != self.color:
-            if not self.board.is_check():
-                board = self.board.copy()
-                board.turn = not board.turn
-            else:
-                return (
-                        result_vector_checks + result_vector_checkmates +
-                        result_vector_stalemates
-                )
-        for m in board.legal_moves:
-            b_c = board.copy()
-            b_c.push(m)
-            p = self.board.piece_at(m.from_square)
-            result_vector_checks[p.piece_type - 1] += b_c.is_check()
-            result_vector_checkmates[p.piece_type - 1] += b_c.is_checkmate()
-            result_vector_stalemates[p.piece_type - 1] += b_c.is_stalemate()
-
-        return (
-                result_vector_checks + result_vector_checkmates +
-                result_vector_stalemates
-        )
+        return threats.threats_vector(self.board, self.color)
 
 
 class KingSafety(BoardFeaturesBase):
 
-    def __init__(self, board: chess.Board, color: chess.Color):
-        super().__init__(board, color)
-        self._cache: LRUCache = LRUCache(
-            maxsize=8)  # most likely 1 is good enough
-
-    KING_PROXIMITY_OFFSET_RING_1 = [
-        [1, 0], [1, -1], [1, 1], [-1, -1],
-        [-1, 0], [-1, 1], [0, 1], [0, -1]
-    ]
-
-    KING_PROXIMITY_OFFSET_RING_2 = [
-        [2, -2], [2, -1], [1, 2], [2, 1], [-2, -2], [-2, -1], [-1, -2], [-2, 1],
-        [2, 0], [1, -2], [-1, 2], [-2, 0], [0, 2], [2, 2], [-2, 2], [0, -2]
-    ]
+    KING_PROXIMITY_OFFSET_RING_1 = bitboard.KING_PROXIMITY_OFFSET_RING_1
+    KING_PROXIMITY_OFFSET_RING_2 = bitboard.KING_PROXIMITY_OFFSET_RING_2
 
     @cached_property
     def checked(self) -> bool:
@@ -360,59 +342,35 @@ class KingSafety(BoardFeaturesBase):
 
     @cached_property
     def king_attackers_looking_at_ring_1(self) -> List[int]:
-        attackers_looking_at_ring, _, _, _ = self.__get_ring_features(
-            self._king_ring_1
-        )
-        return attackers_looking_at_ring
+        return self._ring_features[0].attackers_looking_at_ring
 
     @cached_property
     def king_attackers_at_ring_1(self) -> List[int]:
-        _, _, attackers_at_ring, _ = self.__get_ring_features(
-            self._king_ring_1
-        )
-        return attackers_at_ring
+        return self._ring_features[0].attackers_at_ring
 
     @cached_property
     def king_defenders_at_ring_1(self) -> List[int]:
-        _, _, _, defenders_at_ring = self.__get_ring_features(
-            self._king_ring_1
-        )
-        return defenders_at_ring
+        return self._ring_features[0].defenders_at_ring
 
     @cached_property
     def king_defenders_looking_at_ring_1(self) -> List[int]:
-        _, defenders_looking_at_ring, _, _ = self.__get_ring_features(
-            self._king_ring_1
-        )
-        return defenders_looking_at_ring
+        return self._ring_features[0].defenders_looking_at_ring
 
     @cached_property
     def king_attackers_looking_at_ring_2(self) -> List[int]:
-        attackers_looking_at_ring, _, _, _ = self.__get_ring_features(
-            self._king_ring_2
-        )
-        return attackers_looking_at_ring
+        return self._ring_features[1].attackers_looking_at_ring
 
     @cached_property
     def king_attackers_at_ring_2(self) -> List[int]:
-        _, _, attackers_at_ring, _ = self.__get_ring_features(
-            self._king_ring_2
-        )
-        return attackers_at_ring
+        return self._ring_features[1].attackers_at_ring
 
     @cached_property
     def king_defenders_at_ring_2(self) -> List[int]:
-        _, _, _, defenders_at_ring = self.__get_ring_features(
-            self._king_ring_2
-        )
-        return defenders_at_ring
+        return self._ring_features[1].defenders_at_ring
 
     @cached_property
     def king_defenders_looking_at_ring_2(self) -> List[int]:
-        _, defenders_looking_at_ring, _, _ = self.__get_ring_features(
-            self._king_ring_2
-        )
-        return defenders_looking_at_ring
+        return self._ring_features[1].defenders_looking_at_ring
 
     @cached_property
     def king_mobility(self) -> int:
@@ -422,110 +380,94 @@ class KingSafety(BoardFeaturesBase):
     def king_centrality(self) -> int:
         return self._get_pieces_centrality(chess.KING, self.color).pop()
 
+    @cached_property
+    def _king_square(self) -> chess.Square:
+        square = self.context.kings[self.color]
+        if square is None:
+            raise ValueError(
+                f"no {chess.COLOR_NAMES[self.color]} king on the board"
+            )
+        return square
+
     @cached_property
     def _king_ring_1(self) -> chess.SquareSet:
-        return self.__king_ring(self.KING_PROXIMITY_OFFSET_RING_1)
+        return chess.SquareSet(bitboard.BB_KING_RING_1[self._king_square])
 
     @cached_property
     def _king_ring_2(self) -> chess.SquareSet:
-        return self.__king_ring(self.KING_PROXIMITY_OFFSET_RING_2)
-
-    def __king_ring(self, king_ring_offset) -> chess.SquareSet:
-        n = self.board.pieces(chess.KING, self.color).pop()
-        x, y = n // 8, n % 8
-        squares = chess.SquareSet()
-        for a, b in king_ring_offset:
-            if (8 > x + a >= 0) and (0 <= y + b < 8):
-                squares.add(chess.Square((x + a) * 8 + y + b))
-        return squares
-
-    @cachedmethod(operator.attrgetter('_cache'),
-                  key=lambda self, x: x.mask)
-    def __get_ring_features(self, king_ring) \
-            -> Tuple[List[int], List[int], List[int], List[int]]:
-        attackers_looking_at_ring = [0] * len(chess.PIECE_TYPES)
-        defenders_looking_at_ring = [0] * len(chess.PIECE_TYPES)
-        attackers_at_ring = [0] * len(chess.PIECE_TYPES)
-        defenders_at_ring = [0] * len(chess.PIECE_TYPES)
-
-        attackers_looking_at_ring_seen = set()
-        defenders_looking_at_ring_seen = set()
-        for sq in king_ring:
-
-            p = self.board.piece_at(sq)
-
-            if p:
-                if p.color == (not self.color):
-                    attackers_at_ring[p.piece_type - 1] += 1
-                else:
-                    defenders_at_ring[p.piece_type - 1] += 1
-
-            attackers = self.board.attackers(
-                color=not self.color,
-                square=sq
-            )
+        return chess.SquareSet(bitboard.BB_KING_RING_2[self._king_square])
 
-            defenders = self.board.attackers(
-                color=self.color,
-                square=sq
+    @cached_property
+    def _ring_features(self) -> Tuple[RingFeatures, RingFeatures]:
+        # all ring vectors for both rings at once: every piece's attack mask
+        # is generated once and intersected with the ring masks
+        rings = (self._king_ring_1.mask, self._king_ring_2.mask)
+        looking_at_ring = {
+            color: ([0] * len(chess.PIECE_TYPES),
+                    [0] * len(chess.PIECE_TYPES))
+            for color in chess.COLORS
+        }
+        piece_types = self.context.piece_types
+        for color in chess.COLORS:
+            for sq in chess.scan_reversed(self.board.occupied_co[color]):
+                attacks = self.context.attacks[sq]
+                piece_idx = piece_types[sq] - 1
+                for ring, counts in zip(rings, looking_at_ring[color]):
+                    if attacks & ring:
+                        counts[piece_idx] += 1
+
+        def ring_features(i: int) -> RingFeatures:
+            ring = rings[i]
+            return RingFeatures(
+                attackers_looking_at_ring=looking_at_ring[not self.color][i],
+                defenders_looking_at_ring=looking_at_ring[self.color][i],
+                attackers_at_ring=[
+                    popcount(ring & self.context.pieces[piece_type,
+                                                        not self.color])
+                    for piece_type in chess.PIECE_TYPES
+                ],
+                defenders_at_ring=[
+                    popcount(ring &
+                             self.context.pieces[piece_type, self.color])
+                    for piece_type in chess.PIECE_TYPES
+                ],
             )
 
-            if attackers:
-                for attacker_square in attackers:
-                    piece = self.board.piece_at(attacker_square)
-                    if piece and attacker_square not in attackers_looking_at_ring_seen:
-                        attackers_looking_at_ring[piece.piece_type - 1] += 1
-                        attackers_looking_at_ring_seen.add(attacker_square)
-
-            if defenders:
-                for defender_square in defenders:
-                    piece = self.board.piece_at(defender_square)
-                    if piece and defender_square not in defenders_looking_at_ring_seen:
-                        defenders_looking_at_ring[piece.piece_type - 1] += 1
-                        defenders_looking_at_ring_seen.add(defender_square)
-
-        return (
-            attackers_looking_at_ring, defenders_looking_at_ring,
-            attackers_at_ring, defenders_at_ring
-        )
+        return ring_features(0), ring_features(1)
 
 
 class PawnStructure(BoardFeaturesBase):
 
-    def __init__(self, board: chess.Board, color: chess.Color):
-        super().__init__(board, color)
-        self.pawns_at_file = [0] * 8
-        for p in self.board.pieces(chess.PAWN, color):
-            self.pawns_at_file[chess.square_file(p)] += 1
+    @cached_property
+    def pawns_at_file(self) -> List[int]:
+        return pawns.pawns_at_file(
+            self.context.pieces[chess.PAWN, self.color]
+        )
 
     @cached_property
-    def central_pawns(self) -> int:
-        return len(
-            [
-                0 for p in self.board.pieces(chess.PAWN, self.color) if
-                p in self.CENTRAL_SQUARES
-            ]
+    def _pawn_entry(self) -> pawns.PawnEntry:
+        entries = cache.pawn_cache.get_or_compute(
+            cache.pawn_key(self.board), self._compute_pawn_entries
         )
+        return entries[self.color]
+
+    @cached_property
+    def central_pawns(self) -> int:
+        return self._pawn_entry.central_pawns
 
     @cached_property
     def pawns_advancements(self) -> List[Optional[int]]:
-        files: List[Optional[int]] = [None] * 8
-        for p in self.board.pieces(chess.PAWN, self.color):
-            pawn_file = chess.square_file(p)
-            if files[pawn_file] is not None:
-                files[pawn_file] = max(files[pawn_file],
-                                       p // 8 if self.color else 7 - (p // 8))
-            else:
-                files[pawn_file] = p // 8 if self.color else 7 - (p // 8)
-        return files
+        return list(self._pawn_entry.pawns_advancements)
 
     @cached_property
     def blocked_pawns(self) -> int:
+        mobility_counts = self.context.mobility_counts(self.color,
+                                                       (chess.PAWN,))
         c = 0
         for p in self.board.pieces(chess.PAWN, color=self.color):
             opposite_piece = self.board.piece_at(
                 p + (8 if self.color == chess.WHITE else -8))
-            if (self.mobility_map.get(p) is None and  # no mobility
+            if (not mobility_counts.get(p) and  # no mobility
                     opposite_piece and  # piece in front of current square
                     opposite_piece.color == (not self.color)  # opposite color
             ):
@@ -534,69 +476,68 @@ class PawnStructure(BoardFeaturesBase):
 
     @cached_property
     def isolated_pawns(self) -> int:
-        isolated = 0
-        if self.pawns_at_file[0] > 0 and self.pawns_at_file[1] == 0:
-            isolated += self.pawns_at_file[0]  # or 1 ?
-
-        if self.pawns_at_file[7] > 0 and self.pawns_at_file[6] == 0:
-            isolated += self.pawns_at_file[7]  # or 1 ?
-
-        for i in [1, 2, 3, 4, 5, 6]:
-            if self.pawns_at_file[i] > 0 and self.pawns_at_file[
-                i - 1] == 0 and \
-                    self.pawns_at_file[i + 1] == 0:
-                isolated += self.pawns_at_file[i]  # or 1 ?
-        return isolated
+        return self._pawn_entry.isolated_pawns
 
     @cached_property
     def double_pawns(self) -> int:
-        double_pawns = 0
-        for p in self.pawns_at_file:
-            if p > 1:
-                double_pawns += 1
-        return double_pawns
+        return self._pawn_entry.double_pawns
 
     @cached_property
     def _passed_pawns_set(self) -> chess.SquareSet:
-        # always white perspective
-        b = self.board
-        if self.color == chess.BLACK:
-            b = self.board.mirror()
-
-        m = np.zeros((8, 8))
-        for p in b.pieces(chess.PAWN, chess.WHITE):
-            x, y = p // 8, p % 8
-            m[x][y] = 1
-
-        for p in b.pieces(chess.PAWN, chess.BLACK):
-            x, y = p // 8, p % 8
-            m[x][y] = -1
-
-        s = chess.SquareSet()
-        for x, y in zip(*np.where(m == 1)):
-            if not (any(m[(x + 1):, y] == -1) or (
-                    y < 7 and any(m[(x + 1):, (y + 1)] == -1)) or (
-                            y > 0 and any(m[(x + 1):, (y - 1)] == -1))):
-                s.add(x * 8 + y)
-        return s if self.color == chess.WHITE else s.mirror()
+        return chess.SquareSet(self._pawn_entry.passed_pawns_mask)
 
     @cached_property
     def passed_pawns(self) -> int:
-        return len(self._passed_pawns_set)
+        return self._pawn_entry.passed_pawns
 
     @cached_property
     def pawn_islands(self) -> int:
-        m = np.zeros((8, 8))
-        for p in self.board.pieces(chess.PAWN, self.color):
-            x, y = p // 8, p % 8
-            m[x][y] = 1
-        _, c = label(m, structure=[[1, 1, 1], [1, 1, 1], [1, 1, 1]])
-        return c
+        return self._pawn_entry.pawn_islands
 
     @cached_property
-    def passed_pawns_advancements(self):
-        advancements = []
-        for p in self._passed_pawns_set:
-            advancements.append(
-                p // 8 if self.color == chess.WHITE else 7 - p // 8)
-        return sorted(advancements, reverse=True)
+    def passed_pawns_advancements(self) -> List[int]:
+        return list(self._pawn_entry.passed_pawns_advancements)
+
+    def _compute_pawn_entries(self) \
+            -> Tuple[pawns.PawnEntry, pawns.PawnEntry]:
+        # pawn table entries hold both colors, indexed by color
+        return (
+            PawnStructure(self.board, chess.BLACK)._compute_pawn_entry(),
+            PawnStructure(self.board, chess.WHITE)._compute_pawn_entry(),
+        )
+
+    def _compute_pawn_entry(self) -> pawns.PawnEntry:
+        our_pawns = self.board.pawns & self.board.occupied_co[self.color]
+        their_pawns = (
+                self.board.pawns & self.board.occupied_co[not self.color]
+        )
+        passed_pawns_set = chess.SquareSet(
+            pawns.passed_pawns_mask(our_pawns, their_pawns, self.color)
+        )
+        return pawns.PawnEntry(
+            central_pawns=popcount(our_pawns & BB_CENTER),
+            pawns_advancements=tuple(self._find_pawns_advancements()),
+            isolated_pawns=pawns.isolated_pawns(self.pawns_at_file),
+            double_pawns=pawns.double_pawns(self.pawns_at_file),
+            passed_pawns_mask=passed_pawns_set.mask,
+            passed_pawns=len(passed_pawns_set),
+            passed_pawns_advancements=tuple(sorted(
+                [
+                    p // 8 if self.color == chess.WHITE else 7 - p // 8
+                    for p in passed_pawns_set
+                ],
+                reverse=True
+            )),
+            pawn_islands=pawns.pawn_islands(our_pawns),
+        )
+
+    def _find_pawns_advancements(self) -> List[Optional[int]]:
+        files: List[Optional[int]] = [None] * 8
+        for p in self.board.pieces(chess.PAWN, self.color):
+            pawn_file = chess.square_file(p)
+            if files[pawn_file] is not None:
+                files[pawn_file] = max(files[pawn_file],
+                                       p // 8 if self.color else 7 - (p // 8))
+            else:
+                files[pawn_file] = p // 8 if self.color else 7 - (p // 8)
+        return files
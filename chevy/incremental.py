@@ -0,0 +1,181 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+
+import chess
+
+from chevy import pawns
+from chevy.bitboard import popcount
+
+PawnFeatures = Dict[str, Any]
+
+
+class IncrementalFeatures:
+    # Follows a board along a game: push/pop moves through this object and
+    # material, pawn structure and per-square attack masks are updated only
+    # for what the move changed instead of being recomputed from scratch.
+
+    def __init__(self, board: chess.Board):
+        self.board = board
+        self._material: Dict[chess.Color, List[int]] = {
+            color: [
+                popcount(board.pieces_mask(piece_type, color))
+                for piece_type in chess.PIECE_TYPES
+            ]
+            for color in chess.COLORS
+        }
+        self._attacks: Dict[chess.Square, chess.Bitboard] = {
+            sq: board.attacks_mask(sq)
+            for sq in chess.scan_reversed(board.occupied)
+        }
+        self._pawn_features: Dict[Tuple[int, int],
+                                  Dict[chess.Color, PawnFeatures]] = {}
+        self._undo: List[Tuple[Dict[chess.Square, Optional[chess.Bitboard]],
+                               Dict[chess.Color, List[int]]]] = []
+
+    def push(self, move: chess.Move) -> None:
+        board = self.board
+        before = _piece_masks(board)
+        board.push(move)
+        after = _piece_masks(board)
+
+        changed = 0
+        for b, a in zip(before, after):
+            changed |= b ^ a
+
+        material_delta: Dict[chess.Color, List[int]] = {}
+        for color in chess.COLORS:
+            delta = [
+                popcount(a & after[6 + color]) -
+                popcount(b & before[6 + color])
+                for b, a in zip(before[:6], after[:6])
+            ]
+            if any(delta):
+                material_delta[color] = delta
+                self._material[color] = [
+                    m + d for m, d in zip(self._material[color], delta)
+                ]
+
+        # squares which changed get new attacks, sliders looking at any
+        # of them have their rays recomputed, nothing else is touched
+        sliders = board.bishops | board.rooks | board.queens
+        old_attacks: Dict[chess.Square, Optional[chess.Bitboard]] = {}
+        for sq in chess.scan_reversed(changed):
+            old_attacks[sq] = self._attacks.pop(sq, None)
+            if board.occupied & chess.BB_SQUARES[sq]:
+                self._attacks[sq] = board.attacks_mask(sq)
+        for sq in chess.scan_reversed(sliders & ~changed):
+            if self._attacks[sq] & changed:
+                old_attacks[sq] = self._attacks[sq]
+                self._attacks[sq] = board.attacks_mask(sq)
+
+        self._undo.append((old_attacks, material_delta))
+
+    def pop(self) -> chess.Move:
+        move = self.board.pop()
+        old_attacks, material_delta = self._undo.pop()
+        for sq, mask in old_attacks.items():
+            if mask is None:
+                self._attacks.pop(sq, None)
+            else:
+                self._attacks[sq] = mask
+        for color, delta in material_delta.items():
+            self._material[color] = [
+                m - d for m, d in zip(self._material[color], delta)
+            ]
+        return move
+
+    def attacks_mask(self, square: chess.Square) -> chess.Bitboard:
+        return self._attacks.get(square, 0)
+
+    def material_vector_count(self, color: chess.Color) -> List[int]:
+        return list(self._material[color])
+
+    def pawns_at_file(self, color: chess.Color) -> List[int]:
+        return list(self._get_pawn_features(color)["pawns_at_file"])
+
+    def isolated_pawns(self, color: chess.Color) -> int:
+        return self._get_pawn_features(color)["isolated_pawns"]
+
+    def double_pawns(self, color: chess.Color) -> int:
+        return self._get_pawn_features(color)["double_pawns"]
+
+    def passed_pawns(self, color: chess.Color) -> int:
+        return self._get_pawn_features(color)["passed_pawns"]
+
+    def pawn_islands(self, color: chess.Color) -> int:
+        return self._get_pawn_features(color)["pawn_islands"]
+
+    def our_attacks_map(self, color: chess.Color) \
+            -> Dict[chess.PieceType, List[int]]:
+        board = self.board
+        attacks = {
+            piece_type: [0] * len(chess.PIECE_TYPES)
+            for piece_type in chess.PIECE_TYPES
+        }
+        their_masks = [board.pieces_mask(piece_type, not color)
+                       for piece_type in chess.PIECE_TYPES]
+        for piece_type in chess.PIECE_TYPES:
+            attacking = attacks[piece_type]
+            for sq in chess.scan_reversed(
+                    board.pieces_mask(piece_type, color)):
+                for i, mask in enumerate(their_masks):
+                    attacking[i] += popcount(self._attacks[sq] & mask)
+        return attacks
+
+    def connectivity(self, color: chess.Color) -> int:
+        our_pieces = self.board.occupied_co[color]
+        return sum(
+            popcount(self._attacks[sq] & our_pieces)
+            for sq in chess.scan_reversed(our_pieces)
+        )
+
+    def features(self, color: chess.Color) -> Dict[str, Any]:
+        return {
+            "material_vector_count": self.material_vector_count(color),
+            "pawns_at_file": self.pawns_at_file(color),
+            "isolated_pawns": self.isolated_pawns(color),
+            "double_pawns": self.double_pawns(color),
+            "passed_pawns": self.passed_pawns(color),
+            "pawn_islands": self.pawn_islands(color),
+            "our_attacks_map": self.our_attacks_map(color),
+            "connectivity": self.connectivity(color),
+        }
+
+    def _get_pawn_features(self, color: chess.Color) -> PawnFeatures:
+        # pawn structure only changes on pawn moves and captures of pawns,
+        # so results are kept per pawn placement and reused along the game
+        board = self.board
+        key = (board.pawns & board.occupied_co[chess.WHITE],
+               board.pawns & board.occupied_co[chess.BLACK])
+        entry = self._pawn_features.get(key)
+        if entry is None:
+            entry = {
+                c: _compute_pawn_features(key[c == chess.BLACK],
+                                          key[c == chess.WHITE], c)
+                for c in chess.COLORS
+            }
+            self._pawn_features[key] = entry
+        return entry[color]
+
+
+def _compute_pawn_features(our_pawns: chess.Bitboard,
+                           their_pawns: chess.Bitboard,
+                           color: chess.Color) -> PawnFeatures:
+    at_file = pawns.pawns_at_file(our_pawns)
+    return {
+        "pawns_at_file": at_file,
+        "isolated_pawns": pawns.isolated_pawns(at_file),
+        "double_pawns": pawns.double_pawns(at_file),
+        "passed_pawns": popcount(
+            pawns.passed_pawns_mask(our_pawns, their_pawns, color)
+        ),
+        "pawn_islands": pawns.pawn_islands(our_pawns),
+    }
+
+
+def _piece_masks(board: chess.Board) -> Tuple[chess.Bitboard, ...]:
+    return (
+        board.pawns, board.knights, board.bishops, board.rooks,
+        board.queens, board.kings,
+        board.occupied_co[chess.BLACK], board.occupied_co[chess.WHITE],
+    )
@@ -0,0 +1,140 @@
+from __future__ import annotations
+from typing import Collection, Dict, Optional
+
+import chess
+
+from chevy.bitboard import BB_BACKRANKS, attackers_mask, popcount
+
+
+def mobility_masks(
+        board: chess.Board, color: chess.Color,
+        piece_types: Collection[chess.PieceType] = chess.PIECE_TYPES
+) -> Dict[chess.Square, chess.Bitboard]:
+    # destination squares of every piece of `color` (of the given types), as
+    # if it was `color` to move; pieces other than the king ignore checks and
+    # pins (pseudo-legal moves), the king only gets its legal moves (castling
+    # included)
+    our_pieces = board.occupied_co[color]
+    result = {}
+    pieces = 0
+    for piece_type in (chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN):
+        if piece_type in piece_types:
+            pieces |= board.pieces_mask(piece_type, color)
+    for sq in chess.scan_reversed(pieces):
+        result[sq] = board.attacks_mask(sq) & ~our_pieces
+
+    if chess.PAWN in piece_types:
+        result.update(_pawn_moves_masks(board, color))
+
+    our_king = board.king(color)
+    if chess.KING in piece_types and our_king is not None:
+        result[our_king] = _king_moves_mask(board, color, our_king)
+
+    return result
+
+
+def _pawn_moves_masks(board: chess.Board, color: chess.Color) \
+        -> Dict[chess.Square, chess.Bitboard]:
+    their_pieces = board.occupied_co[not color]
+    occupied = board.occupied
+    pawns = board.pawns & board.occupied_co[color]
+
+    result = {}
+    for sq in chess.scan_reversed(pawns):
+        result[sq] = chess.BB_PAWN_ATTACKS[color][sq] & their_pieces
+
+    if color == chess.WHITE:
+        single_moves = pawns << 8 & ~occupied & chess.BB_ALL
+        double_moves = (single_moves << 8 & ~occupied &
+                        (chess.BB_RANK_3 | chess.BB_RANK_4))
+        forward = 8
+    else:
+        single_moves = pawns >> 8 & ~occupied
+        double_moves = (single_moves >> 8 & ~occupied &
+                        (chess.BB_RANK_6 | chess.BB_RANK_5))
+        forward = -8
+
+    for to_square in chess.scan_reversed(single_moves):
+        result[to_square - forward] |= chess.BB_SQUARES[to_square]
+    for to_square in chess.scan_reversed(double_moves):
+        result[to_square - 2 * forward] |= chess.BB_SQUARES[to_square]
+
+    ep_square = board.ep_square
+    if ep_square and not chess.BB_SQUARES[ep_square] & occupied:
+        capturers = (
+                pawns & chess.BB_PAWN_ATTACKS[not color][ep_square] &
+                chess.BB_RANKS[4 if color else 3]
+        )
+        for sq in chess.scan_reversed(capturers):
+            result[sq] |= chess.BB_SQUARES[ep_square]
+    return result
+
+
+def mobility_counts(
+        board: chess.Board, color: chess.Color,
+        masks: Optional[Dict[chess.Square, chess.Bitboard]] = None
+) -> Dict[chess.Square, int]:
+    # number of moves per square - promotions count once per promotion piece
+    if masks is None:
+        masks = mobility_masks(board, color)
+    promoting_pawns = board.pawns & board.occupied_co[color]
+    result = {}
+    for sq, mask in masks.items():
+        count = popcount(mask)
+        if promoting_pawns & chess.BB_SQUARES[sq]:
+            count += 3 * popcount(mask & BB_BACKRANKS)
+        result[sq] = count
+    return result
+
+
+def _king_moves_mask(board: chess.Board, color: chess.Color,
+                     king: chess.Square) -> chess.Bitboard:
+    # x-ray attacks through our king are taken into account, so the king
+    # does not step back along the line of a sliding checker
+    without_king = board.occupied ^ chess.BB_SQUARES[king]
+    mask = 0
+    for to_square in chess.scan_reversed(
+            chess.BB_KING_ATTACKS[king] & ~board.occupied_co[color]):
+        if not attackers_mask(board, not color, to_square, without_king):
+            mask |= chess.BB_SQUARES[to_square]
+
+    if not attackers_mask(board, not color, king, board.occupied):
+        mask |= _castling_mask(board, color, king)
+    return mask
+
+
+def _castling_mask(board: chess.Board, color: chess.Color,
+                   king_square: chess.Square) -> chess.Bitboard:
+    backrank = chess.BB_RANK_1 if color == chess.WHITE else chess.BB_RANK_8
+    king = chess.BB_SQUARES[king_square]
+    if not king & backrank:
+        return 0
+
+    mask = 0
+    for candidate in chess.scan_reversed(
+            board.clean_castling_rights() & backrank):
+        rook = chess.BB_SQUARES[candidate]
+        a_side = rook < king
+        king_to = (chess.BB_FILE_C if a_side else chess.BB_FILE_G) & backrank
+        rook_to = (chess.BB_FILE_D if a_side else chess.BB_FILE_F) & backrank
+
+        king_path = chess.between(king_square, chess.msb(king_to))
+        rook_path = chess.between(candidate, chess.msb(rook_to))
+
+        if ((board.occupied ^ king ^ rook) &
+                (king_path | rook_path | king_to | rook_to)):
+            continue
+        if any(attackers_mask(board, not color, sq, board.occupied ^ king)
+               for sq in chess.scan_reversed(king_path | king)):
+            continue
+        if attackers_mask(board, not color, chess.msb(king_to),
+                           board.occupied ^ king ^ rook ^ rook_to):
+            continue
+
+        # standard chess castling moves are king moves by two squares
+        if (not board.chess960 and king_square in (chess.E1, chess.E8) and
+                candidate in (chess.A1, chess.H1, chess.A8, chess.H8)):
+            mask |= king_to
+        else:
+            mask |= rook
+    return mask
@@ -0,0 +1,64 @@
+from __future__ import annotations
+from typing import List, NamedTuple, Optional, Tuple
+
+import chess
+
+from chevy.bitboard import BB_NOT_FILE_A, BB_NOT_FILE_H, adjacent_squares, \
+    north_fill, popcount, south_fill
+
+
+class PawnEntry(NamedTuple):
+    central_pawns: int
+    pawns_advancements: Tuple[Optional[int], ...]
+    isolated_pawns: int
+    double_pawns: int
+    passed_pawns_mask: chess.Bitboard
+    passed_pawns: int
+    passed_pawns_advancements: Tuple[int, ...]
+    pawn_islands: int
+
+
+def pawns_at_file(pawns: chess.Bitboard) -> List[int]:
+    return [popcount(pawns & f) for f in chess.BB_FILES]
+
+
+def isolated_pawns(pawns_at_file: List[int]) -> int:
+    isolated = 0
+    for i, count in enumerate(pawns_at_file):
+        left = pawns_at_file[i - 1] if i > 0 else 0
+        right = pawns_at_file[i + 1] if i < 7 else 0
+        if count > 0 and left == 0 and right == 0:
+            isolated += count
+    return isolated
+
+
+def double_pawns(pawns_at_file: List[int]) -> int:
+    return len([p for p in pawns_at_file if p > 1])
+
+
+def passed_pawns_mask(our_pawns: chess.Bitboard,
+                      their_pawns: chess.Bitboard,
+                      color: chess.Color) -> chess.Bitboard:
+    # squares behind their pawns (from their point of view: in front of
+    # them) on the same and adjacent files - our pawns there are not passed
+    if color == chess.WHITE:
+        span = south_fill(their_pawns >> 8)
+    else:
+        span = north_fill(their_pawns << 8 & chess.BB_ALL)
+    span |= (span << 1 & BB_NOT_FILE_A) | (span >> 1 & BB_NOT_FILE_H)
+    return our_pawns & ~span
+
+
+def pawn_islands(pawns: chess.Bitboard) -> int:
+    # groups of pawns touching each other (diagonally included)
+    islands = 0
+    while pawns:
+        island = pawns & -pawns
+        while True:
+            grown = adjacent_squares(island) & pawns
+            if grown == island:
+                break
+            island = grown
+        pawns &= ~island
+        islands += 1
+    return islands
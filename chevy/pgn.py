@@ -0,0 +1,96 @@
+from __future__ import annotations
+from typing import Iterator, List, Optional, TextIO, Union
+
+import chess
+import chess.pgn
+
+
+class MainlineGame:
+    # mainline of a PGN game without the game tree: offers the board() and
+    # mainline_moves() of chess.pgn.Game, so either can be passed to
+    # chevy.pipeline.iter_positions
+    __slots__ = ("headers", "errors", "_board")
+
+    def __init__(self, headers: Optional[chess.pgn.Headers],
+                 board: chess.Board, errors: List[Exception]):
+        self.headers = headers
+        self.errors = errors
+        # the parser's board: the starting position with the mainline pushed
+        self._board = board
+
+    def board(self) -> chess.Board:
+        return self._board.root()
+
+    def mainline_moves(self) -> List[chess.Move]:
+        return list(self._board.move_stack)
+
+    def end(self) -> chess.Board:
+        return self._board.copy()
+
+
+class MainlineVisitor(chess.pgn.BaseVisitor[Optional[MainlineGame]]):
+    # builds a MainlineGame: variations are skipped by the parser, comments
+    # and NAGs are dropped, errors are collected instead of raised (like
+    # chess.pgn.GameBuilder does), headers are only kept if asked for
+
+    def __init__(self, headers: bool = True):
+        self.keep_headers = headers
+        self.found_game = False
+
+    def begin_game(self) -> None:
+        self.found_game = True
+        self.headers: Optional[chess.pgn.Headers] = None
+        self.errors: List[Exception] = []
+        self.start: Optional[chess.Board] = None
+
+    def begin_headers(self) -> Optional[chess.pgn.Headers]:
+        if self.keep_headers:
+            # seven tag roster defaults, like chess.pgn.Game
+            self.headers = chess.pgn.Headers()
+        return self.headers
+
+    def visit_header(self, tagname: str, tagvalue: str) -> None:
+        if self.headers is not None:
+            self.headers[tagname] = tagvalue
+
+    def visit_board(self, board: chess.Board) -> None:
+        # called with the same board for the start and after every mainline
+        # move
+        if self.start is None:
+            self.start = board
+
+    def begin_variation(self) -> chess.pgn.SkipType:
+        return chess.pgn.SKIP
+
+    def handle_error(self, error: Exception) -> None:
+        self.errors.append(error)
+
+    def result(self) -> Optional[MainlineGame]:
+        if self.start is None:
+            # no valid starting position (bad FEN or variant header)
+            return None
+        return MainlineGame(self.headers, self.start, self.errors)
+
+
+def read_mainline(handle: TextIO, headers: bool = True) \
+        -> Optional[MainlineGame]:
+    # next game of `handle`; None at the end of the file, games without a
+    # valid starting position are skipped
+    while True:
+        visitor = MainlineVisitor(headers)
+        game = chess.pgn.read_game(handle, Visitor=lambda: visitor)
+        if game is not None or not visitor.found_game:
+            return game
+
+
+def iter_mainlines(source: Union[str, TextIO],
+                   headers: bool = True) -> Iterator[MainlineGame]:
+    if isinstance(source, str):
+        with open(source) as f:
+            yield from iter_mainlines(f, headers)
+        return
+    while True:
+        game = read_mainline(source, headers)
+        if game is None:
+            return
+        yield game
@@ -0,0 +1,277 @@
+from __future__ import annotations
+import argparse
+import logging
+import os
+import random
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import TYPE_CHECKING, Deque, Iterable, Iterator, List, Optional, \
+    Sequence, TextIO, Tuple, TypeVar, Union
+
+import chess
+import numpy as np
+
+from chevy.batch import extract, schema
+from chevy.store import FeatureStore
+
+if TYPE_CHECKING:
+    import chess.pgn
+    from chevy.pgn import MainlineGame
+
+T = TypeVar("T")
+
+LOGGER = logging.getLogger(__name__)
+
+FORMATS = ("npz", "store")
+
+COLORS = {
+    "white": chess.WHITE,
+    "black": chess.BLACK,
+}
+
+
+def iter_fens(path: str) -> Iterator[str]:
+    if path.endswith(".pgn"):
+        yield from _iter_pgn_fens(path)
+    else:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+
+
+def iter_games(source: Union[str, TextIO]) -> Iterator[chess.pgn.Game]:
+    # games of a PGN file (path or open text file), parsed one at a time;
+    # chevy.pgn.iter_mainlines is faster when only mainlines are needed
+    import chess.pgn
+
+    if isinstance(source, str):
+        with open(source) as f:
+            yield from iter_games(f)
+        return
+    while True:
+        game = chess.pgn.read_game(source)
+        if game is None:
+            return
+        yield game
+
+
+def iter_positions(games: Iterable[Union[chess.pgn.Game, MainlineGame]],
+                   min_ply: int = 0, max_ply: Optional[int] = None,
+                   every: int = 1, sample_rate: float = 1.0,
+                   seed: Optional[int] = None) -> Iterator[chess.Board]:
+    # mainline positions of every game, the starting one included (games
+    # without a valid starting position are skipped); ply counts
+    # half moves from the start of the game; positions with min_ply <= ply
+    # <= max_ply and ply divisible by `every` are each kept with probability
+    # `sample_rate`
+    if every < 1:
+        raise ValueError("every must be positive")
+    if not 0 <= sample_rate <= 1:
+        raise ValueError("sample_rate must be between 0 and 1")
+    rng = random.Random(seed)
+    for game in games:
+        try:
+            board = game.board()
+        except ValueError:
+            # unusable FEN or variant header, read_game logged the error
+            continue
+        for ply, move in enumerate([None, *game.mainline_moves()]):
+            if move is not None:
+                board.push(move)
+            if max_ply is not None and ply > max_ply:
+                break
+            if ply < min_ply or ply % every:
+                continue
+            if sample_rate < 1 and rng.random() >= sample_rate:
+                continue
+            yield board.copy(stack=False)
+
+
+def iter_features(boards: Iterable[Union[chess.Board, str]],
+                  features: Optional[Sequence[str]] = None,
+                  color: str = "turn", chunk_size: int = 1024,
+                  dtype=np.int16) -> Iterator[np.ndarray]:
+    # feature rows (columns of chevy.batch.schema(features)), extracted
+    # `chunk_size` positions at a time; positions that can't be parsed or
+    # have features computed are logged and skipped
+    if color != "turn" and color not in COLORS:
+        raise ValueError(f"unknown color: {color}")
+    for chunk in _chunks(iter(boards), chunk_size):
+        matrix, _ = _extract_rows(chunk, color, features, dtype)
+        yield from matrix
+
+
+def write_chunks(rows: Iterable[np.ndarray], output_dir: str,
+                 features: Optional[Sequence[str]] = None,
+                 chunk_size: int = 65536) -> List[str]:
+    # feature rows into .npz shards of `chunk_size` rows (same layout as the
+    # shards of `run`, without FENs); only one chunk is held in memory
+    columns = np.array(schema(features))
+    os.makedirs(output_dir, exist_ok=True)
+    shards = []
+    for i, chunk in enumerate(_chunks(iter(rows), chunk_size)):
+        path = os.path.join(output_dir, f"shard-{i:05d}.npz")
+        np.savez(path, features=np.stack(chunk), columns=columns)
+        shards.append(path)
+    return shards
+
+
+def _iter_pgn_fens(path: str) -> Iterator[str]:
+    # mainlines only, without building game trees
+    from chevy.pgn import iter_mainlines
+
+    for board in iter_positions(iter_mainlines(path, headers=False)):
+        yield board.fen()
+
+
+def run(input_path: str, output_dir: str,
+        features: Optional[Sequence[str]] = None,
+        color: str = "turn",
+        shard_size: int = 65536,
+        processes: Optional[int] = None,
+        output_format: str = "npz") -> List[str]:
+    # "npz" writes one .npz file per shard, "store" appends shards (in input
+    # order) to the chevy.store.FeatureStore in `output_dir`, creating it if
+    # needed; returns the written files
+    if color != "turn" and color not in COLORS:
+        raise ValueError(f"unknown color: {color}")
+    if output_format not in FORMATS:
+        raise ValueError(f"unknown output format: {output_format}")
+    features = list(features) if features is not None else None
+    schema(features)  # fail early on unknown feature names
+    os.makedirs(output_dir, exist_ok=True)
+    store = None
+    if output_format == "store":
+        store = FeatureStore.open_or_create(output_dir, features)
+
+    processes = processes or os.cpu_count() or 1
+    shards = []
+
+    def collect(future: Future) -> None:
+        if store is None:
+            shards.append(future.result())
+        else:
+            store.append(future.result())
+
+    # bounded number of shards in flight keeps memory usage flat regardless
+    # of the input size, while results are collected in submission order
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for i, fens in enumerate(_chunks(iter_fens(input_path), shard_size)):
+            path = None
+            if store is None:
+                path = os.path.join(output_dir, f"shard-{i:05d}.npz")
+            pending.append(executor.submit(
+                _extract_shard, path, fens, color, features
+            ))
+            if len(pending) >= 2 * processes:
+                collect(pending.popleft())
+        while pending:
+            collect(pending.popleft())
+    if store is not None:
+        return [store.file(group) for group in store.groups]
+    return shards
+
+
+def _chunks(items: Iterator[T], size: int) -> Iterator[List[T]]:
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _colors(boards: List[chess.Board], color: str) -> List[chess.Color]:
+    return [b.turn if color == "turn" else COLORS[color] for b in boards]
+
+
+def _extract_rows(positions: Sequence[Union[chess.Board, str]], color: str,
+                  features: Optional[Sequence[str]], dtype=np.int16) \
+        -> Tuple[np.ndarray, List[int]]:
+    # rows of the positions features can be computed for (a bad FEN or a
+    # missing king fails a single position only) and indices of the others
+    boards = []
+    kept = []
+    skipped = []
+    for i, position in enumerate(positions):
+        try:
+            boards.append(chess.Board(position)
+                          if isinstance(position, str) else position)
+            kept.append(i)
+        except ValueError as e:
+            LOGGER.warning("skipped position %r: %s", position, e)
+            skipped.append(i)
+    try:
+        matrix, _ = extract(boards, _colors(boards, color),
+                            features=features, dtype=dtype)
+        return matrix, skipped
+    except Exception:
+        pass
+
+    # one at a time to find the failing positions
+    rows = []
+    for i, board in zip(kept, boards):
+        try:
+            row, _ = extract([board], _colors([board], color),
+                             features=features, dtype=dtype)
+            rows.append(row)
+        except Exception as e:
+            LOGGER.warning("skipped position %r: %s", board.fen(), e)
+            skipped.append(i)
+    width = len(schema(features))
+    matrix = np.concatenate(rows) if rows else np.empty((0, width), dtype)
+    return matrix, sorted(skipped)
+
+
+def _extract_shard(path: Optional[str], fens: List[str], color: str,
+                   features: Optional[List[str]]) -> Union[str, np.ndarray]:
+    # writes the shard to `path` if given, otherwise returns the rows;
+    # skipped positions are left out (and listed in the shard)
+    matrix, skipped = _extract_rows(fens, color, features)
+    if path is None:
+        return matrix
+    excluded = set(skipped)
+    np.savez(path, features=matrix, columns=np.array(schema(features)),
+             fens=np.array([f for i, f in enumerate(fens)
+                            if i not in excluded]),
+             skipped=np.array([fens[i] for i in skipped], dtype=str))
+    return path
+
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="chevy-extract",
+        description="Extract chevy features from a PGN or FEN file into "
+                    "sharded .npz files or a feature store"
+    )
+    parser.add_argument("input",
+                        help=".pgn file or text file with one FEN per line")
+    parser.add_argument("output_dir")
+    parser.add_argument("--features", nargs="+", default=None,
+                        help="features to extract (default: all)")
+    parser.add_argument("--color", choices=["turn", *COLORS], default="turn",
+                        help="side to compute features for")
+    parser.add_argument("--shard-size", type=int, default=65536,
+                        help="positions per shard")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: cpu count)")
+    parser.add_argument("--format", choices=FORMATS, default="npz",
+                        help="npz shards or a memory-mapped feature store "
+                             "(appended to if it exists)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = _parse_args(argv)
+    shards = run(args.input, args.output_dir, features=args.features,
+                 color=args.color, shard_size=args.shard_size,
+                 processes=args.processes, output_format=args.format)
+    for shard in shards:
+        print(shard)
+
+
+if __name__ == "__main__":
+    main()
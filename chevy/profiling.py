@@ -0,0 +1,144 @@
+from __future__ import annotations
+import json
+import time
+from contextlib import contextmanager
+from functools import cached_property
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+from chevy.compact import _StoredProperty
+from chevy.context import PositionContext
+from chevy.features import BoardFeaturesBase
+
+# instrumented classes keep their original descriptors here, so disabling
+# profiling puts them back and leaves no overhead behind
+_ORIGINALS: List[Tuple[Type, str, Any]] = []
+_STATS: Dict[str, "_Stats"] = {}
+# time spent in nested properties of the ones being computed
+_CHILDREN_TIME: List[float] = []
+
+
+class _Stats:
+    __slots__ = ("calls", "hits", "time", "self_time")
+
+    def __init__(self):
+        self.calls = 0
+        self.hits = 0
+        self.time = 0.0
+        self.self_time = 0.0
+
+
+class _ProfiledProperty:
+    # data descriptor in front of a cached property: counts computations
+    # and cache hits, and measures the time spent computing
+
+    def __init__(self, descriptor, stats: _Stats):
+        self.descriptor = descriptor
+        self.stats = stats
+        self.__doc__ = getattr(descriptor, "__doc__", None)
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        if _is_cached(self.descriptor, instance):
+            self.stats.hits += 1
+            return self.descriptor.__get__(instance, owner)
+
+        _CHILDREN_TIME.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self.descriptor.__get__(instance, owner)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = _CHILDREN_TIME.pop()
+            if _CHILDREN_TIME:
+                _CHILDREN_TIME[-1] += elapsed
+            self.stats.calls += 1
+            self.stats.time += elapsed
+            self.stats.self_time += elapsed - children
+
+    def __set__(self, instance, value) -> None:
+        if isinstance(self.descriptor, cached_property):
+            instance.__dict__[self.descriptor.attrname] = value
+        else:
+            self.descriptor.__set__(instance, value)
+
+
+def enable(classes: Optional[Sequence[Type]] = None) -> None:
+    # instruments cached properties of the given classes (by default the
+    # position context and every feature class defined so far, compact ones
+    # included)
+    for cls in _default_classes() if classes is None else classes:
+        for name, attribute in list(vars(cls).items()):
+            if isinstance(attribute, (cached_property, _StoredProperty)):
+                stats = _STATS.setdefault(f"{cls.__name__}.{name}", _Stats())
+                _ORIGINALS.append((cls, name, attribute))
+                setattr(cls, name, _ProfiledProperty(attribute, stats))
+
+
+def disable() -> None:
+    while _ORIGINALS:
+        cls, name, attribute = _ORIGINALS.pop()
+        setattr(cls, name, attribute)
+
+
+def is_enabled() -> bool:
+    return bool(_ORIGINALS)
+
+
+def reset() -> None:
+    # installed descriptors keep their stats objects, zero them in place
+    for stats in _STATS.values():
+        stats.calls = 0
+        stats.hits = 0
+        stats.time = 0.0
+        stats.self_time = 0.0
+
+
+@contextmanager
+def profiled(classes: Optional[Sequence[Type]] = None) -> Iterator[None]:
+    enable(classes)
+    try:
+        yield
+    finally:
+        disable()
+
+
+def report() -> Dict[str, Dict[str, float]]:
+    # "Class.property" -> computations, cache hits, cumulative and own time
+    # in seconds, slowest first
+    return {
+        name: {
+            "calls": stats.calls,
+            "hits": stats.hits,
+            "time": stats.time,
+            "self_time": stats.self_time,
+        }
+        for name, stats in sorted(_STATS.items(),
+                                  key=lambda item: -item[1].time)
+        if stats.calls or stats.hits
+    }
+
+
+def report_json(path: Optional[str] = None, indent: int = 2) -> str:
+    text = json.dumps(report(), indent=indent)
+    if path is not None:
+        with open(path, "w") as f:
+            f.write(text)
+    return text
+
+
+def _is_cached(descriptor, instance) -> bool:
+    if isinstance(descriptor, cached_property):
+        return descriptor.attrname in instance.__dict__
+    return descriptor.is_cached(instance)
+
+
+def _default_classes() -> List[Type]:
+    classes: List[Type] = [PositionContext]
+    pending = [BoardFeaturesBase]
+    while pending:
+        cls = pending.pop()
+        if cls not in classes:
+            classes.append(cls)
+            pending.extend(cls.__subclasses__())
+    return classes
@@ -0,0 +1,131 @@
+from __future__ import annotations
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, \
+    Sequence, Tuple, Type
+
+from chevy.features import BoardFeaturesBase, BoardFeatures, KingSafety, \
+    PawnStructure
+
+# cost classes, cheapest first
+BOARD = "board"  # bit operations on piece masks
+ATTACKS = "attacks"  # attack masks of pieces, pins
+MOBILITY = "mobility"  # pseudo-legal moves of pieces (legal for the king)
+MOVES = "moves"  # full legal move generation, moves pushed on the board
+COSTS = (BOARD, ATTACKS, MOBILITY, MOVES)
+
+# shared per-position data features are computed from -> cost class
+RESOURCES: Dict[str, str] = {
+    "occupancy": BOARD,
+    "pawn_structure": BOARD,
+    "attacks": ATTACKS,
+    "pins": ATTACKS,
+    "check": ATTACKS,
+    "piece_mobility": MOBILITY,
+    "pawn_mobility": MOBILITY,
+    "king_mobility": MOBILITY,
+    "legal_moves": MOVES,
+}
+
+
+class FeatureSpec(NamedTuple):
+    feature_class: Type[BoardFeaturesBase]
+    function: Callable[[BoardFeaturesBase], Any]
+    dependencies: Tuple[str, ...]  # resources or other features
+    cost: str
+
+
+class FeaturePlan(NamedTuple):
+    features: List[str]  # requested features and their dependencies, in order
+    resources: List[str]
+    cost: str
+
+    @property
+    def generates_moves(self) -> bool:
+        return any(RESOURCES[r] in (MOBILITY, MOVES) for r in self.resources)
+
+
+REGISTRY: Dict[str, FeatureSpec] = {}
+
+
+def register(name: str, feature_class: Type[BoardFeaturesBase],
+             *dependencies: str) -> FeatureSpec:
+    unknown = [d for d in dependencies
+               if d not in RESOURCES and d not in REGISTRY]
+    if unknown:
+        raise ValueError(f"unknown dependencies: {', '.join(unknown)}")
+    spec = REGISTRY[name] = FeatureSpec(
+        feature_class=feature_class,
+        function=attrgetter(name),
+        dependencies=dependencies,
+        cost=max((_cost(d) for d in dependencies), key=COSTS.index,
+                 default=BOARD),
+    )
+    return spec
+
+
+def plan(features: Optional[Sequence[str]] = None) -> FeaturePlan:
+    names = list(REGISTRY) if features is None else list(features)
+    unknown = [f for f in names if f not in REGISTRY]
+    if unknown:
+        raise ValueError(f"unknown features: {', '.join(unknown)}")
+
+    ordered: Dict[str, None] = {}
+    resources: Dict[str, None] = {}
+
+    def visit(name: str) -> None:
+        if name in RESOURCES:
+            resources[name] = None
+        elif name not in ordered:
+            for dependency in REGISTRY[name].dependencies:
+                visit(dependency)
+            ordered[name] = None
+
+    for name in names:
+        visit(name)
+    return FeaturePlan(
+        features=list(ordered),
+        resources=list(resources),
+        cost=max((RESOURCES[r] for r in resources), key=COSTS.index,
+                 default=BOARD),
+    )
+
+
+def _cost(dependency: str) -> str:
+    if dependency in RESOURCES:
+        return RESOURCES[dependency]
+    return REGISTRY[dependency].cost
+
+
+for _name in ("our_pieces_count", "their_pieces_count", "fianchetto_queen",
+              "fianchetto_king", "material_vector_count", "bishop_pair",
+              "knights_centrality", "bishops_centrality", "queens_centrality",
+              "open_files_rooks_count"):
+    register(_name, BoardFeatures, "occupancy")
+register("all_pieces_count", BoardFeatures,
+         "our_pieces_count", "their_pieces_count")
+for _name in ("queens_threats", "knights_threats", "bishop_threats",
+              "rooks_threats", "pawn_threats", "king_threats", "connectivity",
+              "connected_rooks", "connected_knights"):
+    register(_name, BoardFeatures, "attacks")
+for _name in ("bishops_mobility", "knights_mobility", "rooks_mobility",
+              "queens_mobility"):
+    register(_name, BoardFeatures, "piece_mobility")
+register("pawn_mobility_sum", BoardFeatures, "pawn_mobility")
+register("pins_vector", BoardFeatures, "pins")
+register("legal_moves_count", BoardFeatures, "legal_moves")
+register("threats_vector", BoardFeatures, "legal_moves")
+
+register("checked", KingSafety, "check")
+register("castling_rights", KingSafety, "occupancy")
+for _ring in (1, 2):
+    for _name in ("king_attackers_looking_at_ring", "king_attackers_at_ring",
+                  "king_defenders_at_ring", "king_defenders_looking_at_ring"):
+        register(f"{_name}_{_ring}", KingSafety, "attacks")
+register("king_mobility", KingSafety, "king_mobility")
+register("king_centrality", KingSafety, "occupancy")
+
+for _name in ("central_pawns", "pawns_advancements", "isolated_pawns",
+              "double_pawns", "passed_pawns", "pawn_islands",
+              "passed_pawns_advancements"):
+    register(_name, PawnStructure, "pawn_structure")
+register("blocked_pawns", PawnStructure, "pawn_structure", "pawn_mobility")
@@ -0,0 +1,153 @@
+from __future__ import annotations
+from functools import lru_cache, reduce
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+_BOOL = "bool"
+_INT8 = "int8"
+_INT16 = "int16"
+
+
+class FeatureSchema(NamedTuple):
+    width: int
+    dtype: str
+    fill_value: int = -1
+    # variable length features (one entry per piece) are stored as the
+    # `width` largest values in descending order, missing entries are filled
+    ranked: bool = False
+
+
+class Layout(NamedTuple):
+    columns: List[str]
+    offsets: List[Tuple[str, int, int]]  # feature name, offset, width
+    fill_values: List[int]
+    dtype: str
+
+
+# in column order
+SCHEMA: Dict[str, FeatureSchema] = {
+    "our_pieces_count": FeatureSchema(1, _INT8),
+    "their_pieces_count": FeatureSchema(1, _INT8),
+    "all_pieces_count": FeatureSchema(1, _INT8),
+    "queens_threats": FeatureSchema(6, _INT8),
+    "knights_threats": FeatureSchema(6, _INT8),
+    "bishop_threats": FeatureSchema(6, _INT8),
+    "rooks_threats": FeatureSchema(6, _INT8),
+    "pawn_threats": FeatureSchema(6, _INT8),
+    "king_threats": FeatureSchema(6, _INT8),
+    "fianchetto_queen": FeatureSchema(1, _BOOL, 0),
+    "fianchetto_king": FeatureSchema(1, _BOOL, 0),
+    "connectivity": FeatureSchema(1, _INT16),
+    "material_vector_count": FeatureSchema(6, _INT8),
+    "connected_rooks": FeatureSchema(1, _BOOL, 0),
+    "connected_knights": FeatureSchema(1, _BOOL, 0),
+    "bishop_pair": FeatureSchema(1, _BOOL, 0),
+    "bishops_mobility": FeatureSchema(2, _INT8, ranked=True),
+    "knights_mobility": FeatureSchema(2, _INT8, ranked=True),
+    "rooks_mobility": FeatureSchema(2, _INT8, ranked=True),
+    "queens_mobility": FeatureSchema(1, _INT8, ranked=True),
+    "pawn_mobility_sum": FeatureSchema(1, _INT8),
+    "knights_centrality": FeatureSchema(2, _INT8, ranked=True),
+    "bishops_centrality": FeatureSchema(2, _INT8, ranked=True),
+    "queens_centrality": FeatureSchema(1, _INT8, ranked=True),
+    "open_files_rooks_count": FeatureSchema(1, _INT8),
+    "pins_vector": FeatureSchema(6, _INT8),
+    "legal_moves_count": FeatureSchema(1, _INT16),
+    "threats_vector": FeatureSchema(18, _INT16),
+    "checked": FeatureSchema(1, _BOOL, 0),
+    "castling_rights": FeatureSchema(1, _BOOL, 0),
+    "king_attackers_looking_at_ring_1": FeatureSchema(6, _INT8),
+    "king_attackers_at_ring_1": FeatureSchema(6, _INT8),
+    "king_defenders_at_ring_1": FeatureSchema(6, _INT8),
+    "king_defenders_looking_at_ring_1": FeatureSchema(6, _INT8),
+    "king_attackers_looking_at_ring_2": FeatureSchema(6, _INT8),
+    "king_attackers_at_ring_2": FeatureSchema(6, _INT8),
+    "king_defenders_at_ring_2": FeatureSchema(6, _INT8),
+    "king_defenders_looking_at_ring_2": FeatureSchema(6, _INT8),
+    "king_mobility": FeatureSchema(1, _INT8),
+    "king_centrality": FeatureSchema(1, _INT8),
+    "central_pawns": FeatureSchema(1, _INT8),
+    # None (no pawn on a file) is stored as the fill value
+    "pawns_advancements": FeatureSchema(8, _INT8),
+    "blocked_pawns": FeatureSchema(1, _INT8),
+    "isolated_pawns": FeatureSchema(1, _INT8),
+    "double_pawns": FeatureSchema(1, _INT8),
+    "passed_pawns": FeatureSchema(1, _INT8),
+    "pawn_islands": FeatureSchema(1, _INT8),
+    "passed_pawns_advancements": FeatureSchema(8, _INT8, ranked=True),
+}
+
+# feature class -> class_features()
+_CLASS_FEATURES: Dict[type, Tuple[str, ...]] = {}
+
+
+def feature_names(features: Optional[Sequence[str]] = None) -> List[str]:
+    if features is None:
+        return list(SCHEMA)
+    unknown = [f for f in features if f not in SCHEMA]
+    if unknown:
+        raise ValueError(f"unknown features: {', '.join(unknown)}")
+    return list(features)
+
+
+def columns(features: Optional[Sequence[str]] = None) -> List[str]:
+    return list(layout(features).columns)
+
+
+def layout(features: Optional[Sequence[str]] = None,
+           fill_value: Optional[int] = None) -> Layout:
+    return _layout(tuple(feature_names(features)), fill_value)
+
+
+def class_features(feature_class: Type) -> Tuple[str, ...]:
+    # features (in column order) registered for the given feature class
+    try:
+        return _CLASS_FEATURES[feature_class]
+    except KeyError:
+        from chevy.registry import REGISTRY
+
+        names = _CLASS_FEATURES[feature_class] = tuple(
+            name for name in SCHEMA
+            if issubclass(feature_class, REGISTRY[name].feature_class)
+        )
+        return names
+
+
+def empty_row(layout: Layout, dtype=None):
+    import numpy as np
+
+    return np.empty(len(layout.columns), dtype=dtype or layout.dtype)
+
+
+def write(row, offset: int, name: str, value) -> None:
+    # a feature value into its columns of a row (or 1d view of one)
+    if not isinstance(value, list):
+        row[offset] = value
+        return
+    spec = SCHEMA[name]
+    if spec.ranked:
+        value = sorted(value, reverse=True)[:spec.width]
+    for i, v in enumerate(value):
+        if v is not None:
+            row[offset + i] = v
+
+
+@lru_cache(maxsize=None)
+def _layout(names: Tuple[str, ...], fill_value: Optional[int]) -> Layout:
+    import numpy as np
+
+    columns: List[str] = []
+    offsets = []
+    fill_values = []
+    for name in names:
+        spec = SCHEMA[name]
+        offsets.append((name, len(columns), spec.width))
+        if spec.width == 1:
+            columns.append(name)
+        else:
+            columns.extend(f"{name}_{i}" for i in range(spec.width))
+        fill_values.extend([
+            spec.fill_value if fill_value is None else fill_value
+        ] * spec.width)
+    dtype = reduce(np.promote_types, (SCHEMA[n].dtype for n in names),
+                   np.dtype(_BOOL))
+    return Layout(columns, offsets, fill_values, dtype.name)
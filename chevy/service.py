@@ -0,0 +1,285 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Sequence, Set, \
+    Tuple, Union
+
+import chess
+import numpy as np
+
+from chevy.extractor import FeatureExtractor
+from chevy.schema import feature_names
+
+# worker process side: one extractor per requested feature set
+_EXTRACTORS: Dict[Optional[Tuple[str, ...]], FeatureExtractor] = {}
+
+
+class LatencyMetrics:
+    # request latencies (submission to result, in seconds) and batch sizes
+    # over the last `window` requests / batches
+
+    def __init__(self, window: int = 10000):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.batch_sizes: Deque[int] = deque(maxlen=window)
+        self.requests = 0
+        self.batches = 0
+
+    def record_batch(self, size: int) -> None:
+        self.batches += 1
+        self.batch_sizes.append(size)
+
+    def record_latency(self, latency: float) -> None:
+        self.requests += 1
+        self.latencies.append(latency)
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        return float(np.percentile(self.latencies, q))
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": (sum(self.batch_sizes) / len(self.batch_sizes)
+                                if self.batch_sizes else 0.0),
+            "p50_ms": self.percentile(50) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+        }
+
+
+class FeatureService:
+    # feature vectors (see chevy.extractor.FeatureExtractor) for FENs
+    # submitted concurrently from the event loop: requests arriving within
+    # `max_latency` seconds of the first queued one are grouped into batches
+    # of at most `max_batch_size` FENs, extracted in `executor` (a process
+    # pool by default) so the event loop is never blocked by feature code
+
+    def __init__(self, features: Optional[Sequence[str]] = None,
+                 max_batch_size: int = 64, max_latency: float = 0.005,
+                 processes: Optional[int] = None,
+                 executor: Optional[Executor] = None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be positive")
+        if max_latency < 0:
+            raise ValueError("max_latency must not be negative")
+        self.features = (tuple(feature_names(features))
+                         if features is not None else None)
+        self.columns = FeatureExtractor(self.features).columns
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.metrics = LatencyMetrics()
+        self._processes = processes
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._queue: Optional[asyncio.Queue] = None
+        self._full: Optional[asyncio.Event] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Future] = set()
+
+    async def start(self) -> None:
+        if self._batcher is not None:
+            return
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._processes or os.cpu_count() or 1
+            )
+        self._queue = asyncio.Queue()
+        self._full = asyncio.Event()
+        self._batcher = asyncio.ensure_future(self._batch_loop())
+
+    async def close(self) -> None:
+        if self._batcher is None:
+            return
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        self._batcher = None
+        # requests still waiting for a batch will never be served
+        queue = self._queue
+        assert queue is not None
+        while not queue.empty():
+            _, future, _ = queue.get_nowait()
+            future.cancel()
+        if self._running:
+            await asyncio.wait(self._running)
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def __aenter__(self) -> FeatureService:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def extract(self, fen: str) -> np.ndarray:
+        if self._batcher is None:
+            raise RuntimeError("service is not started")
+        if not isinstance(fen, str):
+            raise TypeError(f"expected a FEN string, got {type(fen).__name__}")
+        queue, full = self._queue, self._full
+        assert queue is not None and full is not None
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait((fen, future, time.perf_counter()))
+        if queue.qsize() >= self.max_batch_size:
+            full.set()
+        return await future
+
+    async def _batch_loop(self) -> None:
+        queue, full = self._queue, self._full
+        assert queue is not None and full is not None
+        while True:
+            batch = [await queue.get()]
+            if queue.qsize() + 1 < self.max_batch_size:
+                try:
+                    await asyncio.wait_for(full.wait(), self.max_latency)
+                except asyncio.TimeoutError:
+                    pass
+                except asyncio.CancelledError:
+                    batch[0][1].cancel()
+                    raise
+            full.clear()
+            while len(batch) < self.max_batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            if queue.qsize() >= self.max_batch_size:
+                full.set()
+            # extraction runs while the next batch is being collected
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future,
+                                                 float]]) -> None:
+        self.metrics.record_batch(len(batch))
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self._executor, _extract_batch, self.features,
+                [fen for fen, _, _ in batch]
+            )
+        except Exception as e:
+            results = [e] * len(batch)
+        now = time.perf_counter()
+        for (_, future, submitted), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+            self.metrics.record_latency(now - submitted)
+
+
+def _extract_batch(features: Optional[Tuple[str, ...]],
+                   fens: List[str]) -> List[Union[np.ndarray, Exception]]:
+    try:
+        extractor = _EXTRACTORS[features]
+    except KeyError:
+        extractor = _EXTRACTORS[features] = FeatureExtractor(features)
+    results: List[Union[np.ndarray, Exception]] = []
+    for fen in fens:
+        # a bad FEN or a position features can't be computed for (no king,
+        # say) fails its own request only
+        try:
+            results.append(extractor.extract(chess.Board(fen)))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+async def serve_json_lines(service: FeatureService, reader=None,
+                           writer=None) -> None:
+    # one JSON request per input line: {"id": ..., "fen": ...} is answered
+    # with {"id": ..., "features": [...]} (or {"id": ..., "error": ...}) as
+    # soon as it is ready, so responses may come out of order;
+    # {"id": ..., "metrics": true} is answered with the latency metrics
+    reader = reader or sys.stdin
+    writer = writer or sys.stdout
+    loop = asyncio.get_running_loop()
+    pending = set()
+
+    def respond(response: Dict[str, Any]) -> None:
+        writer.write(json.dumps(response) + "\n")
+        writer.flush()
+
+    async def handle(request: Dict[str, Any]) -> None:
+        response: Dict[str, Any] = {"id": request.get("id")}
+        try:
+            features = await service.extract(request["fen"])
+            response["features"] = features.tolist()
+        except KeyError:
+            response["error"] = "missing fen"
+        except Exception as e:
+            response["error"] = str(e)
+        respond(response)
+
+    while True:
+        # reading in a thread works for pipes, terminals and regular files
+        line = await loop.run_in_executor(None, reader.readline)
+        if not line:
+            break
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            respond({"id": None, "error": f"invalid JSON: {e}"})
+            continue
+        if not isinstance(request, dict):
+            respond({"id": None, "error": "request must be a JSON object"})
+        elif request.get("metrics"):
+            respond({"id": request.get("id"),
+                     "metrics": service.metrics.summary()})
+        else:
+            task = asyncio.ensure_future(handle(request))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.wait(pending)
+
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="chevy-serve",
+        description="Serve chevy feature vectors for FENs as JSON lines on "
+                    "stdin/stdout"
+    )
+    parser.add_argument("--features", nargs="+", default=None,
+                        help="features to extract (default: all)")
+    parser.add_argument("--batch-size", type=int, default=64,
+                        help="maximum FENs per batch")
+    parser.add_argument("--max-latency-ms", type=float, default=5.0,
+                        help="how long a batch waits for more requests")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: cpu count)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = _parse_args(argv)
+    service = FeatureService(features=args.features,
+                             max_batch_size=args.batch_size,
+                             max_latency=args.max_latency_ms / 1000,
+                             processes=args.processes)
+
+    async def serve() -> None:
+        async with service:
+            await serve_json_lines(service)
+
+    asyncio.run(serve())
+    print(json.dumps(service.metrics.summary()), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+from __future__ import annotations
+import json
+import os
+import struct
+from typing import TYPE_CHECKING, Dict, Iterable, List, NamedTuple, \
+    Optional, Sequence, Union
+
+import numpy as np
+
+from chevy.registry import REGISTRY
+from chevy.schema import feature_names, layout
+
+if TYPE_CHECKING:
+    from typing import Literal
+
+    # np.memmap modes for existing files
+    MemmapMode = Literal["r", "r+", "c"]
+
+# a store is a directory with one file per feature class; a file is a header
+# followed by raw C-ordered rows of the class features, so that it can be
+# opened with np.memmap and appended to without rewriting anything:
+#   MAGIC | JSON header length (uint32, little endian) | JSON header |
+#   padding up to a multiple of ALIGNMENT | rows
+MAGIC = b"CHEVYFS1"
+ALIGNMENT = 64
+SUFFIX = ".chevy"
+
+_PREFIX = struct.Struct("<8sI")
+
+
+class StoreHeader(NamedTuple):
+    group: str  # feature class name
+    features: List[str]
+    # all features of the store, in the order of appended rows
+    row_features: List[str]
+    columns: List[str]
+    fill_values: List[int]
+    dtype: str
+    offset: int  # of the first row, in bytes
+
+    @property
+    def row_size(self) -> int:
+        return len(self.columns) * np.dtype(self.dtype).itemsize
+
+
+def read_header(path: str) -> StoreHeader:
+    with open(path, "rb") as f:
+        magic, size = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"not a chevy feature store file: {path}")
+        header = json.loads(f.read(size))
+    return StoreHeader(offset=_data_offset(size), **header)
+
+
+def open_memmap(path: str, mode: MemmapMode = "r") -> np.ndarray:
+    # rows of a store file as a (rows, columns) array backed by the file;
+    # a partially written last row is ignored
+    header = read_header(path)
+    rows = (os.path.getsize(path) - header.offset) // header.row_size
+    if rows == 0:
+        # an empty mapping is not allowed
+        return np.empty((0, len(header.columns)), dtype=header.dtype)
+    return np.memmap(path, dtype=header.dtype, mode=mode,
+                     offset=header.offset,
+                     shape=(rows, len(header.columns)))
+
+
+class FeatureStore:
+    # extracted features split into one file per feature class; rows are
+    # appended with the columns of chevy.batch.extract(features=...) for the
+    # features the store was created with
+
+    def __init__(self, path: str):
+        self.path = path
+        self.headers: Dict[str, StoreHeader] = {}
+        for name in sorted(os.listdir(path)):
+            if name.endswith(SUFFIX):
+                header = read_header(os.path.join(path, name))
+                self.headers[header.group] = header
+        if not self.headers:
+            raise FileNotFoundError(f"no feature store in {path}")
+        self.features: List[str] = next(iter(self.headers.values())) \
+            .row_features
+        self.dtype = np.dtype(next(iter(self.headers.values())).dtype)
+        row_layout = layout(self.features)
+        self.columns: List[str] = list(row_layout.columns)
+        # group -> indices of its columns in `columns`
+        self._indices: Dict[str, np.ndarray] = {}
+        for group, header in self.headers.items():
+            indices = [
+                index for name, offset, width in row_layout.offsets
+                if name in header.features
+                for index in range(offset, offset + width)
+            ]
+            self._indices[group] = np.array(indices)
+
+    @classmethod
+    def create(cls, path: str, features: Optional[Sequence[str]] = None,
+               dtype=np.int16, fill_value: Optional[int] = None) \
+            -> FeatureStore:
+        names = feature_names(features)
+        os.makedirs(path, exist_ok=True)
+        if any(name.endswith(SUFFIX) for name in os.listdir(path)):
+            raise FileExistsError(f"feature store already exists in {path}")
+
+        groups: Dict[str, List[str]] = {}
+        for name in names:
+            group = REGISTRY[name].feature_class.__name__
+            groups.setdefault(group, []).append(name)
+        for group, group_features in groups.items():
+            group_layout = layout(group_features, fill_value)
+            header = json.dumps({
+                "group": group,
+                "features": group_features,
+                "row_features": names,
+                "columns": group_layout.columns,
+                "fill_values": group_layout.fill_values,
+                "dtype": np.dtype(dtype).name,
+            }).encode()
+            with open(os.path.join(path, group + SUFFIX), "wb") as f:
+                f.write(_PREFIX.pack(MAGIC, len(header)))
+                f.write(header)
+                f.write(b" " * (_data_offset(len(header)) - _PREFIX.size -
+                                len(header)))
+        return cls(path)
+
+    @classmethod
+    def open_or_create(cls, path: str,
+                       features: Optional[Sequence[str]] = None,
+                       dtype=np.int16) -> FeatureStore:
+        # an existing store must have the requested features and dtype
+        if not os.path.isdir(path) or \
+                not any(n.endswith(SUFFIX) for n in os.listdir(path)):
+            return cls.create(path, features, dtype)
+        store = cls(path)
+        if store.features != feature_names(features) or \
+                store.dtype != np.dtype(dtype):
+            raise ValueError(
+                f"feature store in {path} has different features or dtype"
+            )
+        return store
+
+    @property
+    def groups(self) -> List[str]:
+        return list(self.headers)
+
+    def file(self, group: str) -> str:
+        return os.path.join(self.path, group + SUFFIX)
+
+    def group_columns(self, group: str) -> List[str]:
+        return self.headers[group].columns
+
+    def memmap(self, group: str, mode: MemmapMode = "r") -> np.ndarray:
+        return open_memmap(self.file(group), mode)
+
+    def __len__(self) -> int:
+        # rows present in every group file
+        return min(
+            (os.path.getsize(self.file(g)) - h.offset) // h.row_size
+            for g, h in self.headers.items()
+        )
+
+    def append(self, rows: np.ndarray) -> None:
+        # rows with `columns`, as returned by chevy.batch.extract
+        rows = np.asarray(rows)
+        if rows.ndim != 2 or rows.shape[1] != len(self.columns):
+            raise ValueError(
+                f"expected rows with {len(self.columns)} columns, got "
+                f"shape {rows.shape}"
+            )
+        count = len(self)
+        for group, indices in self._indices.items():
+            # drop rows an interrupted append left in some groups only
+            end = self.headers[group].offset + \
+                count * self.headers[group].row_size
+            if os.path.getsize(self.file(group)) > end:
+                os.truncate(self.file(group), end)
+            with open(self.file(group), "ab") as f:
+                f.write(np.ascontiguousarray(rows[:, indices],
+                                             dtype=self.dtype).tobytes())
+
+    def extend(self, rows: Iterable[np.ndarray],
+               chunk_size: int = 65536) -> int:
+        # appends rows (e.g. from chevy.pipeline.iter_features) holding at
+        # most `chunk_size` of them in memory; returns the number appended
+        count = 0
+        chunk: List[np.ndarray] = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                self.append(np.stack(chunk))
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            self.append(np.stack(chunk))
+            count += len(chunk)
+        return count
+
+    def read(self, rows: Union[slice, Sequence[int], None] = None) \
+            -> np.ndarray:
+        # a copy of the selected rows of all groups, with `columns`
+        count = len(self)
+        selection = slice(None) if rows is None else rows
+        parts = {group: self.memmap(group)[:count][selection]
+                 for group in self._indices}
+        out = np.empty((len(next(iter(parts.values()))), len(self.columns)),
+                       dtype=self.dtype)
+        for group, indices in self._indices.items():
+            out[:, indices] = parts[group]
+        return out
+
+
+def _data_offset(header_size: int) -> int:
+    size = _PREFIX.size + header_size
+    return -(-size // ALIGNMENT) * ALIGNMENT
@@ -0,0 +1,78 @@
+import chess
+import numpy as np
+import pytest
+
+from chevy.batch import extract, schema, FEATURES
+from chevy.features import BoardFeatures, KingSafety, PawnStructure
+
+
+def test_schema():
+    columns = schema()
+    assert len(columns) == sum(width for _, width in FEATURES.values())
+    assert len(set(columns)) == len(columns)
+    assert schema(["checked", "material_vector_count"]) == [
+        "checked",
+        "material_vector_count_0", "material_vector_count_1",
+        "material_vector_count_2", "material_vector_count_3",
+        "material_vector_count_4", "material_vector_count_5",
+    ]
+
+    with pytest.raises(ValueError):
+        schema(["not_a_feature"])
+
+
+def test_extract_matches_feature_classes():
+    fens = [
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "5kr1/4pp1p/1Q2q3/1PBP2p1/2P3P1/p7/4P3/1R2K1B1 w - - 0 19",
+        "2r3k1/7R/6PK/6P1/2Q5/8/8/8 b - - 6 73",
+    ]
+    boards = [chess.Board(fen) for fen in fens]
+    features = ["material_vector_count", "threats_vector", "checked",
+                "king_mobility", "passed_pawns", "pawn_islands"]
+    matrix, columns = extract(boards, chess.BLACK, features=features)
+    assert matrix.shape == (3, len(columns))
+
+    for row, board in zip(matrix, boards):
+        board_features = BoardFeatures(board, chess.BLACK)
+        king_safety = KingSafety(board, chess.BLACK)
+        pawn_structure = PawnStructure(board, chess.BLACK)
+        assert list(row[:6]) == board_features.material_vector_count
+        assert list(row[6:24]) == board_features.threats_vector
+        assert row[24] == king_safety.checked
+        assert row[25] == king_safety.king_mobility
+        assert row[26] == pawn_structure.passed_pawns
+        assert row[27] == pawn_structure.pawn_islands
+
+
+def test_extract_padding():
+    fen = "5kr1/4pp1p/1Q2q3/1PBP2p1/2P3P1/p7/4P3/1R2K1B1 w - - 0 19"
+    board = chess.Board(fen)
+    matrix, columns = extract(
+        [fen, board], [chess.WHITE, chess.BLACK],
+        features=["bishops_mobility", "pawns_advancements",
+                  "passed_pawns_advancements"]
+    )
+    assert len(columns) == 18
+    assert matrix[0, :2].tolist() == [7, 4]
+    assert matrix[1, :2].tolist() == [-1, -1]
+    assert matrix[0, 2:10].tolist() == [
+        -1 if a is None else a
+        for a in PawnStructure(board, chess.WHITE).pawns_advancements
+    ]
+    assert matrix[0, 10:].tolist() == [4, 3] + [-1] * 6
+    assert matrix.dtype == np.int16
+
+
+def test_extract_colors_length_mismatch():
+    with pytest.raises(ValueError):
+        extract([chess.Board()], [chess.WHITE, chess.BLACK])
+
+
+def test_extract_numpy_colors():
+    boards = [chess.Board(), chess.Board("4k3/8/8/8/8/8/4P3/4K3 b - - 0 1")]
+    expected, _ = extract(boards, [chess.BLACK, chess.WHITE])
+    assert np.array_equal(extract(boards, np.array([False, True]))[0],
+                          expected)
+    assert np.array_equal(extract(boards, np.bool_(True))[0],
+                          extract(boards, chess.WHITE)[0])
@@ -0,0 +1,46 @@
+import chess
+
+from chevy.benchmarks.__main__ import main
+from chevy.benchmarks.positions import POSITIONS, fens
+from chevy.benchmarks.suite import compare, run
+from chevy.registry import REGISTRY
+
+
+def test_positions():
+    for group, group_fens in POSITIONS.items():
+        for fen in group_fens:
+            board = chess.Board(fen)
+            assert board.is_valid(), fen
+            assert board.is_check() == (group == "in_check"), fen
+    assert len(fens(["endgames"])) == len(POSITIONS["endgames"])
+
+
+def test_run():
+    results = run(fens(["endgames"])[:2], number=1, repeat=1)
+    assert set(results["features"]) == set(REGISTRY)
+    assert set(results["classes"]) == {
+        "BoardFeatures", "CompactBoardFeatures", "KingSafety",
+        "CompactKingSafety", "PawnStructure", "CompactPawnStructure",
+    }
+    assert all(v > 0 for values in results.values() for v in values.values())
+
+
+def test_compare():
+    baseline = {"classes": {"KingSafety": 100.0},
+                "memory": {"KingSafety": 1000.0}}
+    assert compare({"classes": {"KingSafety": 90.0},
+                    "memory": {"KingSafety": 1100.0}}, baseline) == []
+    assert compare({"classes": {"KingSafety": 70.0},
+                    "memory": {"KingSafety": 1300.0}}, baseline) == [
+        ("classes", "KingSafety", 100.0, 70.0),
+        ("memory", "KingSafety", 1000.0, 1300.0),
+    ]
+
+
+def test_main(tmp_path, capsys):
+    path = str(tmp_path / "results.json")
+    argv = ["--positions", "openings", "--sections", "classes",
+            "--number", "1", "--repeat", "1"]
+    assert main(argv + ["--save", path]) == 0
+    assert "KingSafety" in capsys.readouterr().out
+    assert main(argv + ["--compare", path, "--tolerance", "100"]) == 0
@@ -0,0 +1,54 @@
+import chess
+import numpy as np
+
+from chevy import bitboard
+from chevy.utils import count_bits
+
+
+def test_popcount():
+    for mask in [0, 1, chess.BB_ALL, chess.BB_RANK_2, 1 << 63,
+                 chess.BB_LIGHT_SQUARES]:
+        assert bitboard.popcount(mask) == bin(mask).count("1")
+        assert count_bits(mask) == bin(mask).count("1")
+
+
+def test_popcount_array():
+    masks = np.array([0, 1, chess.BB_ALL, chess.BB_RANK_2, 1 << 63],
+                     dtype=np.uint64)
+    assert bitboard.popcount_array(masks).tolist() == [0, 1, 64, 8, 1]
+    assert bitboard.popcount_array(masks.reshape(1, 5)).shape == (1, 5)
+
+
+def test_masks():
+    assert bitboard.BB_ADJACENT_FILES[0] == chess.BB_FILE_B
+    assert bitboard.BB_ADJACENT_FILES[4] == chess.BB_FILE_D | chess.BB_FILE_F
+    assert bitboard.CENTRALITY[chess.A1] == 3
+    assert bitboard.CENTRALITY[chess.E4] == 0
+    assert bitboard.CENTRALITY[chess.C6] == 1
+    assert bitboard.adjacent_squares(chess.BB_A1) == (
+            chess.BB_A1 | chess.BB_A2 | chess.BB_B1 | chess.BB_B2
+    )
+    assert bitboard.north_fill(chess.BB_E4) == chess.BB_FILE_E & ~(
+            chess.BB_E1 | chess.BB_E2 | chess.BB_E3
+    )
+    assert bitboard.south_fill(chess.BB_E2) == chess.BB_E1 | chess.BB_E2
+
+
+def test_attackers_mask_with_occupancy():
+    board = chess.Board("4r1k1/8/8/8/4K3/8/8/8 w - - 0 1")
+    assert bitboard.attackers_mask(
+        board, chess.BLACK, chess.E3, board.occupied
+    ) == 0
+    # x-ray through the king
+    assert bitboard.attackers_mask(
+        board, chess.BLACK, chess.E3, board.occupied ^ chess.BB_E4
+    ) == chess.BB_E8
+
+
+def test_king_rings():
+    for sq in chess.SQUARES:
+        assert bitboard.BB_KING_RING_1[sq] == chess.BB_KING_ATTACKS[sq]
+        assert not bitboard.BB_KING_RING_1[sq] & bitboard.BB_KING_RING_2[sq]
+    assert len(chess.SquareSet(bitboard.BB_KING_RING_2[chess.E4])) == 16
+    assert chess.SquareSet(bitboard.BB_KING_RING_2[chess.A1]) == \
+        chess.SquareSet([chess.A3, chess.B3, chess.C3, chess.C2, chess.C1])
@@ -0,0 +1,117 @@
+import chess
+import numpy as np
+import pytest
+
+from chevy import cache
+from chevy.batch import extract
+from chevy.features import PawnStructure
+
+
+def test_feature_cache_lru():
+    feature_cache = cache.FeatureCache(maxsize=2)
+    assert feature_cache.get_or_compute("a", lambda: 1) == 1
+    assert feature_cache.get_or_compute("b", lambda: 2) == 2
+    assert feature_cache.get_or_compute("a", lambda: 3) == 1
+    assert feature_cache.get_or_compute("c", lambda: 4) == 4
+    # "b" was least recently used
+    assert feature_cache.get_or_compute("b", lambda: 5) == 5
+    assert feature_cache.info() == {
+        "hits": 1, "misses": 4, "size": 2, "maxsize": 2
+    }
+    feature_cache.clear()
+    assert feature_cache.info()["size"] == 0
+
+
+def test_extract_cache_transpositions():
+    cache.clear()
+    board_1 = chess.Board()
+    for uci in ["g1f3", "g8f6", "b1c3"]:
+        board_1.push_uci(uci)
+    board_2 = chess.Board()
+    for uci in ["b1c3", "g8f6", "g1f3"]:
+        board_2.push_uci(uci)
+
+    rows, _ = extract([board_1, board_2, board_2], [True, True, False],
+                      cache=True)
+    assert np.array_equal(rows[0], rows[1])
+    assert cache.cache_info()["positions"]["hits"] == 1
+    expected, _ = extract([board_1, board_2], [True, False])
+    assert np.array_equal(rows[[0, 2]], expected)
+
+    # rows are cached per feature selection and dtype, as copies
+    rows[0] = 0
+    extract([board_2], features=["checked"], cache=True)
+    assert cache.cache_info()["positions"]["hits"] == 1
+    again, _ = extract([board_2], cache=True)
+    assert np.array_equal(again[0], expected[0])
+    extract([board_2], dtype=np.int32, cache=True)
+    assert cache.cache_info()["positions"] == {
+        "hits": 2, "misses": 4, "size": 4,
+        "maxsize": cache.DEFAULT_POSITION_CACHE_SIZE
+    }
+
+
+def test_pawn_cache_shared_between_positions():
+    cache.clear()
+    # same pawns, different pieces
+    fen_1 = "5kr1/4pp1p/1Q2q3/1PBP2p1/2P3P1/p7/4P3/1R2K1B1 w - - 0 19"
+    fen_2 = "4k3/4pp1p/8/1P1P2p1/2P3P1/p7/4P3/4K3 w - - 0 19"
+    pawn_structure_1 = PawnStructure(chess.Board(fen_1), chess.WHITE)
+    pawn_structure_2 = PawnStructure(chess.Board(fen_2), chess.WHITE)
+    assert pawn_structure_1.passed_pawns == pawn_structure_2.passed_pawns == 2
+    assert pawn_structure_1.pawn_islands == pawn_structure_2.pawn_islands
+
+    # one entry holds both colors
+    pawn_structure_3 = PawnStructure(chess.Board(fen_2), chess.BLACK)
+    assert pawn_structure_3.pawns_advancements == [
+        5, None, None, None, 1, 1, 3, 1
+    ]
+    assert cache.cache_info()["pawns"] == {
+        "hits": 2, "misses": 1, "size": 1,
+        "maxsize": cache.DEFAULT_PAWN_CACHE_SIZE
+    }
+
+
+def test_pawn_entries():
+    board = chess.Board(
+        "5kr1/4pp1p/1Q2q3/1PBP2p1/2P3P1/p7/4P3/1R2K1B1 w - - 0 19"
+    )
+    black, white = PawnStructure(board, chess.WHITE)._compute_pawn_entries()
+    assert white.passed_pawns == 2
+    assert white.passed_pawns_advancements == (4, 3)
+    assert black.passed_pawns == 1
+    assert black.pawn_islands == 4
+
+
+def test_extract_with_cache():
+    cache.clear()
+    boards = [chess.Board(), chess.Board(), chess.Board()]
+    cached, _ = extract(boards, cache=True)
+    uncached, _ = extract(boards)
+    assert np.array_equal(cached, uncached)
+    assert cache.cache_info()["positions"]["hits"] == 2
+
+
+def test_eviction_policies():
+    feature_cache = cache.FeatureCache(maxsize=2, eviction="lfu")
+    feature_cache.get_or_compute("a", lambda: 1)
+    feature_cache.get_or_compute("a", lambda: 1)
+    feature_cache.get_or_compute("b", lambda: 2)
+    feature_cache.get_or_compute("c", lambda: 3)
+    # "b" was least frequently used
+    assert feature_cache.get_or_compute("a", lambda: 4) == 1
+    assert feature_cache.get_or_compute("b", lambda: 5) == 5
+
+    with pytest.raises(ValueError):
+        cache.FeatureCache(maxsize=2, eviction="unknown")
+
+
+def test_configure():
+    cache.configure(position_cache_size=4, pawn_cache_size=8,
+                    pawn_cache_eviction="fifo")
+    assert cache.cache_info()["positions"]["maxsize"] == 4
+    assert cache.cache_info()["pawns"]["maxsize"] == 8
+    assert cache.pawn_cache.eviction == "fifo"
+    cache.configure()
+    assert cache.cache_info()["positions"]["maxsize"] == \
+        cache.DEFAULT_POSITION_CACHE_SIZE
@@ -0,0 +1,52 @@
+import chess
+import pytest
+
+from chevy.compact import CompactBoardFeatures, CompactKingSafety, \
+    CompactPawnStructure, compact_class
+from chevy.context import PositionContext
+from chevy.features import BoardFeatures, KingSafety, PawnStructure
+from chevy.schema import class_features
+
+FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "5kr1/4pp1p/1Q2q3/1PBP2p1/2P3P1/p7/4P3/1R2K1B1 w - - 0 19",
+    "r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQK2R w KQkq - 0 5",
+]
+
+
+@pytest.mark.parametrize("feature_class", [BoardFeatures, KingSafety,
+                                           PawnStructure])
+def test_same_values(feature_class):
+    for fen in FENS:
+        board = chess.Board(fen)
+        context = PositionContext(board)
+        for color in chess.COLORS:
+            regular = feature_class(board, color)
+            compact = compact_class(feature_class)(board, color, context)
+            for name in class_features(feature_class):
+                assert getattr(compact, name) == getattr(regular, name), name
+            assert compact.mobility_map == regular.mobility_map
+            assert compact.to_array().tolist() == \
+                regular.to_array().tolist()
+
+
+def test_no_instance_dict():
+    board = chess.Board(FENS[1])
+    features = CompactPawnStructure(board, chess.WHITE)
+    features.pawn_islands
+    features.pawns_at_file
+    assert not hasattr(features, "__dict__") or not vars(features)
+    assert compact_class(PawnStructure) is CompactPawnStructure
+
+
+def test_store_is_shared_per_color():
+    board = chess.Board(FENS[2])
+    context = PositionContext(board)
+    white = CompactBoardFeatures(board, chess.WHITE, context)
+    king_safety = CompactKingSafety(board, chess.WHITE, context)
+    black = CompactBoardFeatures(board, chess.BLACK, context)
+    assert white._values is king_safety._values
+    assert white._values is not black._values
+    # inherited values are computed once for all classes of a color
+    assert white.our_attacks_map is king_safety.our_attacks_map
+    assert white.our_attacks_map is not black.our_attacks_map
@@ -0,0 +1,50 @@
+import chess
+
+from chevy.context import PositionContext
+from chevy.features import BoardFeatures, KingSafety, PawnStructure
+
+
+def test_pinned():
+    board = chess.Board("4k3/4r3/8/1b6/8/3N4/4B3/4K3 w - - 0 1")
+    context = PositionContext(board)
+    assert context.pinned[chess.WHITE] == chess.BB_E2
+    assert context.pinned[chess.BLACK] == 0
+    for color in chess.COLORS:
+        for sq in chess.scan_reversed(board.occupied_co[color]):
+            assert (bool(context.pinned[color] & chess.BB_SQUARES[sq]) ==
+                    board.is_pinned(color, sq))
+
+
+def test_pinned_without_king():
+    board = chess.Board("8/8/8/8/8/8/4r3/8 w - - 0 1")
+    assert PositionContext(board).pinned == {chess.WHITE: 0, chess.BLACK: 0}
+
+
+def test_attacks_and_pieces():
+    board = chess.Board()
+    context = PositionContext(board)
+    assert set(context.attacks) == set(chess.SquareSet(board.occupied))
+    assert context.attacks[chess.G1] == board.attacks_mask(chess.G1)
+    assert context.pieces[chess.ROOK, chess.BLACK] == \
+        chess.BB_A8 | chess.BB_H8
+    assert context.piece_types[chess.D8] == chess.QUEEN
+    assert context.kings == {chess.WHITE: chess.E1, chess.BLACK: chess.E8}
+
+
+def test_shared_context():
+    board = chess.Board(
+        "r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQK2R w KQkq - "
+        "0 5"
+    )
+    context = PositionContext(board)
+    for color in chess.COLORS:
+        for feature_class, name in ((BoardFeatures, "pins_vector"),
+                                    (BoardFeatures, "connectivity"),
+                                    (BoardFeatures, "queens_threats"),
+                                    (KingSafety, "king_mobility"),
+                                    (PawnStructure, "blocked_pawns")):
+            assert getattr(feature_class(board, color, context), name) == \
+                getattr(feature_class(board, color), name)
+    # mobility is generated once per color and reused by every class
+    assert BoardFeatures(board, chess.WHITE, context).mobility_counts is \
+        KingSafety(board, chess.WHITE, context).mobility_counts
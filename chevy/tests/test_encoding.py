@@ -0,0 +1,107 @@
+import chess
+import numpy as np
+import pytest
+
+from chevy import vectorized
+from chevy.batch import extract
+from chevy.encoding import RECORD_DTYPE, RECORD_SIZE, as_records, decode, \
+    decode_many, encode, encode_many, load_positions, piece_masks, \
+    save_positions
+from chevy.extractor import FeatureExtractor
+from chevy.features import BoardFeatures, KingSafety
+from chevy.compact import CompactPawnStructure
+from chevy.vectorized import encode_boards
+
+FENS = [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    # legal en passant
+    "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3",
+    "r3k2r/pp3ppp/2n5/3p4/3P4/2N5/PP3PPP/R3K2R b Kq - 17 112",
+    "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1",
+    "8/8/8/3k4/8/8/4K3/8 w - - 99 150",
+]
+
+
+def test_round_trip():
+    boards = [chess.Board(fen) for fen in FENS]
+    records = encode_many(boards)
+    assert records.dtype == RECORD_DTYPE
+    assert records.nbytes == RECORD_SIZE * len(FENS) == 32 * len(FENS)
+    assert [b.fen() for b in decode_many(records)] == FENS
+    for board in boards:
+        data = encode(board)
+        assert len(data) == RECORD_SIZE
+        assert decode(data) == board
+
+    raw = np.frombuffer(records.tobytes(), dtype=np.uint8).reshape(-1, 32)
+    assert [b.fen() for b in decode_many(raw)] == FENS
+    assert [b.fen() for b in decode_many(as_records(records.tobytes()))] == \
+        FENS
+
+
+def test_unkept_state():
+    # en passant without a legal capture, castling rights without a rook
+    board = chess.Board("4k3/8/8/8/4P3/8/8/R3K3 b KQ e3 0 1")
+    assert decode(encode(board)).fen() == "4k3/8/8/8/4P3/8/8/R3K3 b Q - 0 1"
+
+    board = chess.Board("1r2k1r1/8/8/8/8/8/8/R3K1R1 w AGbg - 0 1",
+                        chess960=True)
+    decoded = decode(encode(board))
+    assert decoded.chess960
+    assert decoded.castling_rights == board.castling_rights
+
+
+def test_invalid():
+    board = chess.Board(None)
+    board.pawns = board.occupied_co[chess.WHITE] = board.occupied = \
+        chess.BB_RANK_2 | chess.BB_RANK_3 | chess.BB_RANK_4 | chess.BB_RANK_5 \
+        | chess.BB_A6
+    with pytest.raises(ValueError):
+        encode(board)
+
+    records = encode_many([chess.Board()])
+    records["occupied"] |= np.uint64(1 << 40)
+    with pytest.raises(ValueError):
+        piece_masks(records)
+    with pytest.raises(ValueError):
+        decode(b"\x00" * 31)
+    with pytest.raises(ValueError):
+        as_records(np.zeros((2, 31), dtype=np.uint8))
+
+
+def test_feature_apis_consume_records(tmp_path):
+    boards = [chess.Board(fen) for fen in FENS]
+    records = encode_many(boards)
+
+    expected, columns = extract(boards, chess.BLACK)
+    assert np.array_equal(extract(records, chess.BLACK)[0], expected)
+    assert np.array_equal(extract(list(map(encode, boards)),
+                                  chess.BLACK)[0], expected)
+
+    extractor = FeatureExtractor()
+    assert np.array_equal(extractor.extract_many(records),
+                          extractor.extract_many(boards))
+    assert np.array_equal(extractor.extract(encode(boards[3])),
+                          extractor.extract(boards[3]))
+
+    assert np.array_equal(vectorized.from_records(records),
+                          encode_boards(boards))
+    assert np.array_equal(vectorized.extract(records)[0],
+                          vectorized.extract(encode_boards(boards))[0])
+
+    data = encode(boards[1])
+    for feature_class in (BoardFeatures, KingSafety, CompactPawnStructure):
+        features = feature_class.from_encoded(data, chess.BLACK)
+        assert isinstance(features, feature_class)
+        assert np.array_equal(features.to_array(),
+                              feature_class(boards[1], chess.BLACK)
+                              .to_array())
+
+    path = str(tmp_path / "positions.bin")
+    assert save_positions(path, boards[:2]) == 2
+    save_positions(path, boards[2:], append=True)
+    loaded = load_positions(path)
+    assert isinstance(loaded, np.memmap)
+    assert [b.fen() for b in decode_many(loaded)] == FENS
+    assert np.array_equal(load_positions(path, mmap=False), records)
@@ -0,0 +1,39 @@
+import chess
+import numpy as np
+
+from chevy.batch import extract, schema
+from chevy.extractor import FeatureExtractor
+
+FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "5kr1/4pp1p/1Q2q3/1PBP2p1/2P3P1/p7/4P3/1R2K1B1 w - - 0 19",
+    "2r3k1/7R/6PK/6P1/2Q5/8/8/8 b - - 6 73",
+]
+
+
+def test_columns():
+    extractor = FeatureExtractor(["checked", "bishops_mobility"])
+    assert extractor.columns == [
+        "white_checked", "white_bishops_mobility_0",
+        "white_bishops_mobility_1",
+        "black_checked", "black_bishops_mobility_0",
+        "black_bishops_mobility_1",
+    ]
+    assert len(FeatureExtractor().columns) == 2 * len(schema())
+
+
+def test_extract_matches_batch():
+    extractor = FeatureExtractor()
+    white, _ = extract(FENS, chess.WHITE)
+    black, _ = extract(FENS, chess.BLACK)
+    matrix = extractor.extract_many(FENS)
+    assert matrix.shape == (len(FENS), len(extractor.columns))
+    assert np.array_equal(matrix, np.hstack([white, black]))
+    assert np.array_equal(extractor.extract(chess.Board(FENS[1])), matrix[1])
+
+
+def test_extract_into_buffer():
+    extractor = FeatureExtractor(["material_vector_count"], dtype=np.int8)
+    out = np.zeros(12, dtype=np.int8)
+    assert extractor.extract(chess.Board(), out=out) is out
+    assert out.tolist() == [8, 2, 2, 2, 1, 1] * 2
@@ -0,0 +1,15 @@
+from chevy.benchmarks.imports import LAZY_DEPENDENCIES, import_time, \
+    loaded_modules
+
+
+def test_features_import_is_light():
+    assert loaded_modules("chevy.features") == []
+
+
+def test_pipeline_does_not_load_pgn_parser():
+    assert "chess.pgn" not in loaded_modules("chevy.pipeline",
+                                             LAZY_DEPENDENCIES)
+
+
+def test_import_time():
+    assert 0 < import_time("chevy.bitboard", repeat=1) < float("inf")
@@ -0,0 +1,54 @@
+import chess
+
+from chevy.features import BoardFeatures, PawnStructure
+from chevy.incremental import IncrementalFeatures
+
+# https://lichess.org/editor - includes castling, en passant and a promotion
+MOVES = [
+    "e2e4", "d7d5", "e4e5", "f7f5", "e5f6", "g8f6", "g1f3", "e7e6",
+    "f1e2", "f8e7", "e1g1", "e8g8", "d2d4", "c7c5", "d4c5", "b8c6",
+    "c5c6", "d8d7", "c6b7", "d7d6", "b7a8q",
+]
+
+
+def _expected(board, color):
+    board_features = BoardFeatures(board, color)
+    pawn_structure = PawnStructure(board, color)
+    return {
+        "material_vector_count": board_features.material_vector_count,
+        "pawns_at_file": pawn_structure.pawns_at_file,
+        "isolated_pawns": pawn_structure.isolated_pawns,
+        "double_pawns": pawn_structure.double_pawns,
+        "passed_pawns": pawn_structure.passed_pawns,
+        "pawn_islands": pawn_structure.pawn_islands,
+        "our_attacks_map": board_features.our_attacks_map,
+        "connectivity": board_features.connectivity,
+    }
+
+
+def test_incremental_features_follow_game():
+    incremental = IncrementalFeatures(chess.Board())
+    for uci in MOVES:
+        incremental.push(chess.Move.from_uci(uci))
+        for color in chess.COLORS:
+            assert incremental.features(color) == _expected(
+                incremental.board, color
+            )
+    assert incremental.material_vector_count(chess.WHITE) == [
+        6, 2, 2, 2, 2, 1
+    ]
+
+
+def test_incremental_features_pop():
+    incremental = IncrementalFeatures(chess.Board())
+    initial = incremental.features(chess.WHITE)
+    for uci in MOVES:
+        incremental.push(chess.Move.from_uci(uci))
+    for _ in MOVES:
+        incremental.pop()
+        for color in chess.COLORS:
+            assert incremental.features(color) == _expected(
+                incremental.board, color
+            )
+    assert incremental.features(chess.WHITE) == initial
+    assert incremental.board == chess.Board()
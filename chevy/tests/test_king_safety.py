@@ -1,4 +1,5 @@
 import chess
+import pytest
 
 from chevy.features import KingSafety
 
@@ -411,3 +412,11 @@ def test_king_mobility():
     assert king_safety.king_mobility == 0
     king_safety = KingSafety(board, color=chess.BLACK)
     assert king_safety.king_mobility == 0
+
+
+def test_missing_king():
+    board = chess.Board("6q1/8/8/8/8/8/8/K7 w - - 0 1")
+    king_safety = KingSafety(board, chess.BLACK)
+    for name in ("king_defenders_at_ring_1", "king_attackers_at_ring_2"):
+        with pytest.raises(ValueError, match="no black king"):
+            getattr(king_safety, name)
@@ -0,0 +1,43 @@
+import chess
+
+from chevy.mobility import mobility_counts, mobility_masks
+
+
+def test_mobility_counts_starting_position():
+    board = chess.Board()
+    for color in chess.COLORS:
+        counts = mobility_counts(board, color)
+        assert sum(counts.values()) == 20
+        assert len(counts) == 16
+        assert counts[board.king(color)] == 0
+
+
+def test_mobility_ignores_side_to_move_and_pins():
+    # black to move, white bishop on d2 pinned by the queen on a5
+    fen = "4k3/8/8/q7/8/8/3B4/4K3 b - - 0 1"
+    board = chess.Board(fen)
+    counts = mobility_counts(board, chess.WHITE)
+    assert counts[chess.D2] == 8
+    assert counts[chess.E1] == 4
+
+
+def test_mobility_promotions_and_castling():
+    fen = "1n2k3/P7/8/8/8/8/8/R3K2R w KQ - 0 1"
+    board = chess.Board(fen)
+    counts = mobility_counts(board, chess.WHITE)
+    # push and capture, four promotion pieces each
+    assert counts[chess.A7] == 8
+    # five king steps plus both castling moves
+    assert counts[chess.E1] == 7
+    masks = mobility_masks(board, chess.WHITE)
+    assert masks[chess.E1] & chess.BB_G1
+    assert masks[chess.E1] & chess.BB_C1
+
+
+def test_king_mobility_in_check():
+    # the king may not step back along the rook's line
+    fen = "4r1k1/8/8/8/8/8/8/4K3 w - - 0 1"
+    board = chess.Board(fen)
+    masks = mobility_masks(board, chess.WHITE)
+    assert masks[chess.E1] == chess.BB_D1 | chess.BB_F1 | chess.BB_D2 | \
+        chess.BB_F2
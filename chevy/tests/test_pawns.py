@@ -0,0 +1,38 @@
+import chess
+
+from chevy import pawns
+
+
+def _mask(*squares):
+    return chess.SquareSet(squares).mask
+
+
+def test_passed_pawns_mask():
+    white = _mask(chess.A2, chess.D4, chess.H5)
+    black = _mask(chess.C6, chess.H7)
+    assert pawns.passed_pawns_mask(white, black, chess.WHITE) == _mask(
+        chess.A2
+    )
+    assert pawns.passed_pawns_mask(black, white, chess.BLACK) == 0
+    assert pawns.passed_pawns_mask(black, _mask(chess.A2),
+                                   chess.BLACK) == black
+    # a pawn which already passed the enemy pawn is passed
+    assert pawns.passed_pawns_mask(_mask(chess.E6), _mask(chess.D5),
+                                   chess.WHITE) == _mask(chess.E6)
+
+
+def test_pawn_islands():
+    assert pawns.pawn_islands(0) == 0
+    assert pawns.pawn_islands(_mask(chess.A2, chess.B3, chess.C4)) == 1
+    assert pawns.pawn_islands(_mask(chess.A2, chess.B4)) == 2
+    assert pawns.pawn_islands(_mask(chess.A2, chess.H2, chess.H3)) == 2
+    assert pawns.pawn_islands(chess.BB_RANK_2) == 1
+
+
+def test_isolated_and_double_pawns():
+    at_file = pawns.pawns_at_file(
+        _mask(chess.A2, chess.C2, chess.C3, chess.D4, chess.H2, chess.H4)
+    )
+    assert at_file == [1, 0, 2, 1, 0, 0, 0, 2]
+    assert pawns.isolated_pawns(at_file) == 3
+    assert pawns.double_pawns(at_file) == 2
@@ -0,0 +1,75 @@
+import io
+
+from chevy.benchmarks.pgn import games_per_second, sample_pgn
+from chevy.pgn import iter_mainlines, read_mainline
+from chevy.pipeline import iter_games, iter_positions
+
+PGN = """[Event "first"]
+[Result "*"]
+
+1. e4 {best} e5 (1... c5 2. Nf3 (2. c3) d6) 2. Nf3 $1 Nc6 3. Bb5 a6 *
+
+[Event "bad fen"]
+[FEN "not a fen"]
+
+1. e4 *
+
+[Event "from fen"]
+[FEN "4k3/8/8/8/8/8/8/4K2R w K - 0 1"]
+[SetUp "1"]
+
+1. O-O Kd7 2. Rd1+ Kc6 *
+
+[Event "illegal"]
+
+1. e4 e5 2. Ke3 Nc6 *
+"""
+
+
+def test_mainlines_match_read_game():
+    games = [g for g in iter_games(io.StringIO(PGN))
+             if g.headers["Event"] != "bad fen"]
+    mainlines = list(iter_mainlines(io.StringIO(PGN)))
+    assert len(mainlines) == len(games) == 3
+    for game, mainline in zip(games, mainlines):
+        assert mainline.headers == game.headers
+        assert mainline.board() == game.board()
+        assert mainline.mainline_moves() == list(game.mainline_moves())
+        assert mainline.end() == game.end().board()
+        assert bool(mainline.errors) == bool(game.errors)
+
+    assert [m.uci() for m in mainlines[0].mainline_moves()] == [
+        "e2e4", "e7e5", "g1f3", "b8c6", "f1b5", "a7a6"
+    ]
+    assert mainlines[1].board().fen() == "4k3/8/8/8/8/8/8/4K2R w K - 0 1"
+    # moves after an illegal one are dropped
+    assert len(mainlines[2].mainline_moves()) == 2
+
+
+def test_read_mainline(tmp_path):
+    handle = io.StringIO(PGN)
+    game = read_mainline(handle, headers=False)
+    assert game.headers is None
+    assert read_mainline(handle).headers["Event"] == "from fen"
+    read_mainline(handle)
+    assert read_mainline(handle) is None
+
+    path = tmp_path / "games.pgn"
+    path.write_text(PGN)
+    games = [g for g in iter_games(str(path))
+             if g.headers["Event"] != "bad fen"]
+    positions = iter_positions(iter_mainlines(str(path)), min_ply=1)
+    assert [b.fen() for b in positions] == [
+        b.fen() for b in iter_positions(games, min_ply=1)
+    ]
+
+
+def test_benchmark():
+    pgn = sample_pgn(2, seed=1)
+    games = list(iter_games(io.StringIO(pgn)))
+    assert len(games) == 2
+    assert all(g.variations[0].comment for g in games)
+    result = games_per_second(pgn, number=1, repeat=1)
+    assert set(result) == {"read_game", "read_mainline",
+                           "read_mainline (no headers)"}
+    assert all(v > 0 for v in result.values())
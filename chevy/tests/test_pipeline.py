@@ -0,0 +1,163 @@
+from itertools import islice
+
+import chess
+import numpy as np
+import pytest
+
+from chevy.batch import extract
+from chevy.pipeline import iter_features, iter_fens, iter_games, \
+    iter_positions, main, run, write_chunks
+
+PGN = """[Event "?"]
+[Result "*"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bb5 a6 *
+
+[Event "?"]
+[Result "*"]
+
+1. d4 d5 2. c4 (2. Nf3 Nf6) 2... e6 *
+"""
+
+
+def test_iter_fens(tmp_path):
+    path = tmp_path / "games.pgn"
+    path.write_text(PGN)
+    fens = list(iter_fens(str(path)))
+    assert len(fens) == 7 + 5
+    assert fens[0] == chess.STARTING_FEN
+    assert fens[7] == chess.STARTING_FEN
+
+    path = tmp_path / "positions.fen"
+    path.write_text("\n".join(fens[:3]) + "\n\n")
+    assert list(iter_fens(str(path))) == fens[:3]
+
+
+def test_run_shards_in_order(tmp_path):
+    path = tmp_path / "games.pgn"
+    path.write_text(PGN)
+    features = ["material_vector_count", "knights_mobility", "checked"]
+    shards = run(str(path), str(tmp_path / "out"), features=features,
+                 shard_size=5, processes=2)
+    assert [s.rsplit("/", 1)[-1] for s in shards] == [
+        "shard-00000.npz", "shard-00001.npz", "shard-00002.npz"
+    ]
+
+    loaded = [np.load(s) for s in shards]
+    matrix = np.concatenate([shard["features"] for shard in loaded])
+    fens = np.concatenate([shard["fens"] for shard in loaded]).tolist()
+    assert fens == list(iter_fens(str(path)))
+
+    boards = [chess.Board(fen) for fen in fens]
+    expected, columns = extract(boards, [b.turn for b in boards],
+                                features=features)
+    assert np.array_equal(matrix, expected)
+    assert loaded[0]["columns"].tolist() == columns
+
+
+def test_main(tmp_path, capsys):
+    path = tmp_path / "games.pgn"
+    path.write_text(PGN)
+    main([str(path), str(tmp_path / "out"), "--color", "white",
+          "--features", "pawn_islands", "--processes", "1"])
+    out = capsys.readouterr().out.split()
+    assert len(out) == 1
+    shard = np.load(out[0])
+    assert shard["features"].shape == (12, 1)
+
+
+def test_iter_positions_filters(tmp_path):
+    path = tmp_path / "games.pgn"
+    path.write_text(PGN)
+    fens = list(iter_fens(str(path)))
+
+    boards = list(iter_positions(iter_games(str(path))))
+    assert [b.fen() for b in boards] == fens
+
+    boards = iter_positions(iter_games(str(path)), min_ply=1, max_ply=4,
+                            every=2)
+    assert [b.fen() for b in boards] == [fens[2], fens[4], fens[9], fens[11]]
+
+    with open(path) as f:
+        sampled = [b.fen() for b in iter_positions(iter_games(f),
+                                                   sample_rate=0.5, seed=1)]
+    assert 0 < len(sampled) < len(fens)
+    assert set(sampled) <= set(fens)
+    assert sampled == [b.fen() for b in iter_positions(
+        iter_games(str(path)), sample_rate=0.5, seed=1
+    )]
+
+    with pytest.raises(ValueError):
+        list(iter_positions([], every=0))
+
+
+def test_iter_positions_skips_bad_start(tmp_path):
+    path = tmp_path / "games.pgn"
+    bad = '[Event "?"]\n[FEN "not a fen"]\n\n1. e4 *\n\n'
+    first, second = PGN.split("\n\n[Event")
+    path.write_text(first + "\n\n" + bad + "[Event" + second)
+    fens = [b.fen() for b in iter_positions(iter_games(str(path)))]
+    assert len(fens) == 7 + 5
+    assert fens[7] == chess.STARTING_FEN
+
+
+def test_iter_features_is_lazy():
+    def positions():
+        while True:
+            yield chess.Board()
+            yield chess.STARTING_FEN
+
+    features = ["material_vector_count", "checked"]
+    rows = list(islice(iter_features(positions(), features, "black",
+                                     chunk_size=3), 4))
+    expected, _ = extract([chess.Board()] * 4, chess.BLACK, features=features)
+    assert np.array_equal(np.stack(rows), expected)
+
+
+def test_write_chunks(tmp_path):
+    path = tmp_path / "games.pgn"
+    path.write_text(PGN)
+    features = ["pawn_islands", "king_mobility"]
+    rows = iter_features(iter_positions(iter_games(str(path))), features,
+                         chunk_size=4)
+    shards = write_chunks(rows, str(tmp_path / "out"), features,
+                          chunk_size=5)
+    assert len(shards) == 3
+
+    matrix = np.concatenate([np.load(s)["features"] for s in shards])
+    boards = [chess.Board(fen) for fen in iter_fens(str(path))]
+    expected, columns = extract(boards, [b.turn for b in boards],
+                                features=features)
+    assert np.array_equal(matrix, expected)
+    assert np.load(shards[0])["columns"].tolist() == columns
+
+
+def test_run_skips_bad_positions(tmp_path):
+    # a kingless study position and a malformed FEN line
+    path = tmp_path / "positions.fen"
+    fens = list(iter_fens(_write_pgn(tmp_path)))
+    path.write_text("\n".join(
+        fens[:2] + ["8/8/8/8/8/8/8/K7 b - - 0 1", "not a fen"] + fens[2:4]
+    ) + "\n")
+    shards = run(str(path), str(tmp_path / "out"), features=None,
+                 shard_size=3, processes=1)
+    loaded = [np.load(s) for s in shards]
+    matrix = np.concatenate([shard["features"] for shard in loaded])
+    assert np.concatenate([s["fens"] for s in loaded]).tolist() == fens[:4]
+    assert np.concatenate([s["skipped"] for s in loaded]).tolist() == [
+        "8/8/8/8/8/8/8/K7 b - - 0 1", "not a fen"
+    ]
+
+    boards = [chess.Board(fen) for fen in fens[:4]]
+    expected, _ = extract(boards, [b.turn for b in boards])
+    assert np.array_equal(matrix, expected)
+    rows = list(iter_features(
+        [chess.Board("8/8/8/8/8/8/8/K7 b - - 0 1")] + boards, chunk_size=3
+    ))
+    assert np.array_equal(np.stack(rows), expected)
+
+
+def _write_pgn(tmp_path) -> str:
+    path = tmp_path / "games.pgn"
+    path.write_text(PGN)
+    return str(path)
@@ -0,0 +1,73 @@
+import json
+from functools import cached_property
+
+import chess
+
+from chevy import profiling
+from chevy.compact import CompactKingSafety
+from chevy.features import BoardFeatures, BoardFeaturesBase, KingSafety
+
+
+def test_counts_and_hits():
+    profiling.reset()
+    with profiling.profiled():
+        assert profiling.is_enabled()
+        for color in chess.COLORS:
+            features = BoardFeatures(chess.Board(), color)
+            features.queens_threats
+            features.knights_threats
+            features.queens_threats
+    report = profiling.report()
+    assert report["BoardFeatures.queens_threats"]["calls"] == 2
+    assert report["BoardFeatures.queens_threats"]["hits"] == 2
+    attacks_map = report["BoardFeaturesBase.our_attacks_map"]
+    assert attacks_map["calls"] == 2
+    assert attacks_map["hits"] == 2
+    assert 0 <= attacks_map["self_time"] <= attacks_map["time"]
+    # own time excludes the nested our_attacks_map computation
+    threats = report["BoardFeatures.queens_threats"]
+    assert threats["self_time"] < threats["time"]
+    assert "BoardFeatures.pins_vector" not in report
+
+
+def test_reset_while_enabled():
+    with profiling.profiled():
+        BoardFeatures(chess.Board()).queens_threats
+        profiling.reset()
+        assert profiling.report() == {}
+        BoardFeatures(chess.Board()).queens_threats
+        report = profiling.report()
+    assert report["BoardFeatures.queens_threats"]["calls"] == 1
+    assert report["BoardFeatures.queens_threats"]["hits"] == 0
+
+
+def test_compact_classes_and_ring_features():
+    profiling.reset()
+    with profiling.profiled():
+        features = CompactKingSafety(chess.Board(), chess.WHITE)
+        features.king_attackers_at_ring_1
+        features.king_defenders_at_ring_2
+    report = profiling.report()
+    assert report["CompactKingSafety._ring_features"] == {
+        **report["CompactKingSafety._ring_features"], "calls": 1, "hits": 1
+    }
+
+
+def test_disable_restores_descriptors():
+    original = vars(BoardFeaturesBase)["mobility_map"]
+    profiling.enable([KingSafety, BoardFeaturesBase])
+    assert vars(BoardFeaturesBase)["mobility_map"] is not original
+    profiling.disable()
+    assert vars(BoardFeaturesBase)["mobility_map"] is original
+    assert isinstance(vars(KingSafety)["checked"], cached_property)
+    assert not profiling.is_enabled()
+
+
+def test_report_json(tmp_path):
+    profiling.reset()
+    with profiling.profiled([KingSafety]):
+        KingSafety(chess.Board(), chess.BLACK).checked
+    path = tmp_path / "profile.json"
+    text = profiling.report_json(str(path))
+    assert json.loads(path.read_text()) == json.loads(text)
+    assert list(json.loads(text)) == ["KingSafety.checked"]
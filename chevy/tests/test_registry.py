@@ -0,0 +1,55 @@
+import chess
+import pytest
+
+from chevy import context
+from chevy.batch import FEATURES
+from chevy.registry import REGISTRY, MOVES, BOARD, plan, register
+
+FEN = "r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQK2R w KQkq - 0 5"
+
+
+def test_every_feature_is_registered():
+    assert set(REGISTRY) == set(FEATURES)
+    for name, (feature_class, _) in FEATURES.items():
+        assert REGISTRY[name].feature_class is feature_class
+
+
+def test_plan():
+    p = plan(["all_pieces_count", "material_vector_count"])
+    assert p.features == ["our_pieces_count", "their_pieces_count",
+                          "all_pieces_count", "material_vector_count"]
+    assert p.resources == ["occupancy"]
+    assert p.cost == BOARD
+    assert not p.generates_moves
+
+    p = plan(["pawn_islands", "threats_vector", "blocked_pawns"])
+    assert p.resources == ["pawn_structure", "legal_moves", "pawn_mobility"]
+    assert p.cost == MOVES
+    assert p.generates_moves
+
+    with pytest.raises(ValueError):
+        plan(["not_a_feature"])
+    with pytest.raises(ValueError):
+        register("broken", REGISTRY["checked"].feature_class, "nothing")
+
+
+@pytest.mark.parametrize("name", sorted(REGISTRY))
+def test_dependencies_are_complete(name, monkeypatch):
+    # features must not touch resources they do not declare
+    resources = plan([name]).resources
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError(f"{name} generates moves")
+
+    if "legal_moves" not in resources:
+        monkeypatch.setattr(chess.Board, "generate_legal_moves", forbidden)
+    if not {"piece_mobility", "pawn_mobility",
+            "king_mobility"} & set(resources):
+        monkeypatch.setattr(context, "mobility_masks", forbidden)
+    if "attacks" not in resources:
+        monkeypatch.setattr(context.PositionContext, "attacks",
+                            property(forbidden))
+
+    spec = REGISTRY[name]
+    for color in chess.COLORS:
+        spec.function(spec.feature_class(chess.Board(FEN), color))
@@ -0,0 +1,59 @@
+import chess
+import numpy as np
+import pytest
+
+from chevy import schema
+from chevy.batch import extract
+from chevy.features import BoardFeatures, KingSafety, PawnStructure
+from chevy.registry import REGISTRY
+
+FEN = "5kr1/4pp1p/1Q2q3/1PBP2p1/2P3P1/p7/4P3/1R2K1B1 w - - 0 19"
+
+
+def test_every_feature_has_a_schema():
+    assert set(schema.SCHEMA) == set(REGISTRY)
+    assert sum(len(c.columns()) for c in
+               (BoardFeatures, KingSafety, PawnStructure)) == \
+        len(schema.columns())
+
+
+def test_layout():
+    layout = schema.layout(["checked", "bishops_mobility",
+                            "pawns_advancements"])
+    assert layout.columns[:3] == ["checked", "bishops_mobility_0",
+                                  "bishops_mobility_1"]
+    assert layout.offsets == [("checked", 0, 1), ("bishops_mobility", 1, 2),
+                              ("pawns_advancements", 3, 8)]
+    assert layout.fill_values == [0] + [-1] * 10
+    assert layout.dtype == "int8"
+    assert schema.layout(["checked"]).dtype == "bool"
+    assert schema.layout(["checked", "threats_vector"]).dtype == "int16"
+    assert schema.layout(["checked"], fill_value=7).fill_values == [7]
+
+
+def test_to_array_matches_batch():
+    board = chess.Board(FEN)
+    for color in chess.COLORS:
+        row = np.concatenate([
+            feature_class(board, color).to_array()
+            for feature_class in (BoardFeatures, KingSafety, PawnStructure)
+        ])
+        matrix, columns = extract([board], color, features=[
+            c for feature_class in (BoardFeatures, KingSafety, PawnStructure)
+            for c in schema.class_features(feature_class)
+        ])
+        assert row.tolist() == matrix[0].tolist()
+
+
+def test_to_array_into_buffer():
+    features = PawnStructure(chess.Board(FEN), chess.WHITE)
+    out = np.zeros((2, 9), dtype=np.int16)
+    result = features.to_array(out=out[1],
+                               features=["passed_pawns_advancements",
+                                         "passed_pawns"])
+    assert result.base is out
+    assert out[1].tolist() == [4, 3, -1, -1, -1, -1, -1, -1, 2]
+    assert PawnStructure.columns(["passed_pawns"]) == ["passed_pawns"]
+
+    with pytest.raises(ValueError):
+        features.to_array(features=["checked"])
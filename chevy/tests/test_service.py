@@ -0,0 +1,141 @@
+import asyncio
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import chess
+import numpy as np
+import pytest
+
+from chevy.extractor import FeatureExtractor
+from chevy.service import FeatureService, LatencyMetrics, serve_json_lines
+
+FENS = [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1",
+    "4k3/8/8/8/8/8/4q3/4K3 w - - 0 1",
+    "r3k2r/pp3ppp/2n5/3p4/3P4/2N5/PP3PPP/R3K2R b KQkq - 0 12",
+]
+FEATURES = ["material_vector_count", "knights_mobility", "checked"]
+
+
+def test_concurrent_requests_are_batched():
+    extractor = FeatureExtractor(FEATURES)
+
+    async def run():
+        service = FeatureService(FEATURES, max_batch_size=3, max_latency=0.2,
+                                 executor=ThreadPoolExecutor(2))
+        async with service:
+            results = await asyncio.gather(
+                *(service.extract(fen) for fen in FENS)
+            )
+        return service, results
+
+    service, results = asyncio.run(run())
+    for fen, result in zip(FENS, results):
+        assert np.array_equal(result, extractor.extract(chess.Board(fen)))
+    # full batches are sent without waiting for the latency budget
+    assert list(service.metrics.batch_sizes) == [3, 2]
+    summary = service.metrics.summary()
+    assert summary["requests"] == len(FENS)
+    assert summary["mean_batch_size"] == 2.5
+    # the last, partial batch waits out the latency budget
+    assert 0 < summary["p50_ms"] < 200 <= summary["p99_ms"]
+
+
+def test_process_pool_and_bad_fen():
+    async def run():
+        async with FeatureService(FEATURES, max_latency=0.01,
+                                  processes=1) as service:
+            return await asyncio.gather(
+                service.extract(FENS[1]), service.extract("not a fen"),
+                return_exceptions=True
+            )
+
+    features, error = asyncio.run(run())
+    assert np.array_equal(
+        features, FeatureExtractor(FEATURES).extract(chess.Board(FENS[1]))
+    )
+    assert isinstance(error, ValueError)
+
+
+def test_bad_position_fails_only_its_request():
+    async def run():
+        # all features, king safety ones included
+        async with FeatureService(max_batch_size=3, max_latency=1,
+                                  executor=ThreadPoolExecutor(1)) as service:
+            results = await asyncio.gather(
+                service.extract("8/8/8/8/8/8/8/K7 w - - 0 1"),
+                service.extract(FENS[2]),
+                service.extract("8/8/8/8/8/8/8/8 w - - 0 1"),
+                return_exceptions=True
+            )
+            with pytest.raises(TypeError):
+                await service.extract(5)
+        return service, results
+
+    service, (kingless, features, empty) = asyncio.run(run())
+    assert list(service.metrics.batch_sizes) == [3]
+    assert isinstance(kingless, Exception)
+    assert isinstance(empty, Exception)
+    assert np.array_equal(
+        features, FeatureExtractor().extract(chess.Board(FENS[2]))
+    )
+
+
+def test_service_arguments():
+    with pytest.raises(ValueError):
+        FeatureService(["no_such_feature"])
+    with pytest.raises(ValueError):
+        FeatureService(max_batch_size=0)
+
+    async def run():
+        await FeatureService().extract(chess.STARTING_FEN)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+
+
+def test_latency_metrics():
+    metrics = LatencyMetrics(window=100)
+    assert metrics.summary()["p99_ms"] == 0
+    for i in range(1, 201):
+        metrics.record_latency(i / 1000)
+    assert metrics.requests == 200
+    assert metrics.percentile(50) == pytest.approx(0.1505)
+    assert metrics.summary()["p99_ms"] == pytest.approx(199.01)
+
+
+def test_serve_json_lines():
+    requests = [
+        json.dumps({"id": 1, "fen": FENS[0]}),
+        "",
+        json.dumps({"id": 2, "fen": "not a fen"}),
+        json.dumps({"id": 3}),
+        "{",
+    ]
+    reader = io.StringIO("\n".join(requests) + "\n")
+    writer = io.StringIO()
+
+    async def run():
+        async with FeatureService(FEATURES, max_latency=0.01,
+                                  executor=ThreadPoolExecutor(1)) as service:
+            await serve_json_lines(service, reader, writer)
+            metrics = io.StringIO()
+            await serve_json_lines(
+                service, io.StringIO('{"id": 4, "metrics": true}\n'), metrics
+            )
+            return json.loads(metrics.getvalue())
+
+    metrics = asyncio.run(run())
+    responses = {
+        r["id"]: r for r in map(json.loads, writer.getvalue().splitlines())
+    }
+    assert responses[1]["features"] == FeatureExtractor(FEATURES).extract(
+        chess.Board()).tolist()
+    assert "error" in responses[2]
+    assert responses[3]["error"] == "missing fen"
+    assert responses[None]["error"].startswith("invalid JSON")
+    assert metrics["id"] == 4
+    assert metrics["metrics"]["requests"] == 2
@@ -0,0 +1,106 @@
+import os
+
+import chess
+import numpy as np
+import pytest
+
+from chevy.batch import extract
+from chevy.pipeline import iter_features, iter_fens, run
+from chevy.store import FeatureStore, open_memmap, read_header
+from chevy.tests.test_pipeline import PGN
+
+BOARDS = [
+    chess.Board(),
+    chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq "
+                "- 2 3"),
+    chess.Board("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1"),
+]
+
+
+def test_create_append_and_read(tmp_path):
+    path = str(tmp_path / "store")
+    store = FeatureStore.create(path)
+    assert store.groups == ["BoardFeatures", "KingSafety", "PawnStructure"]
+    assert len(store) == 0
+    assert store.read().shape == (0, len(store.columns))
+
+    matrix, columns = extract(BOARDS)
+    store.append(matrix)
+    store.append(matrix[:1])
+    assert store.columns == columns
+
+    reopened = FeatureStore(path)
+    assert len(reopened) == 4
+    assert np.array_equal(reopened.read(), np.vstack([matrix, matrix[:1]]))
+    assert np.array_equal(reopened.read([2, 0]), matrix[[2, 0]])
+    assert np.array_equal(reopened.read(slice(1, 3)), matrix[1:3])
+
+    # each group file is a header followed by raw rows
+    header = read_header(store.file("KingSafety"))
+    assert header.offset % 64 == 0
+    assert header.columns == store.group_columns("KingSafety")
+    rows = np.memmap(store.file("KingSafety"), dtype=header.dtype, mode="r",
+                     offset=header.offset).reshape(-1, len(header.columns))
+    king_columns = [columns.index(c) for c in header.columns]
+    assert np.array_equal(rows[:3], matrix[:, king_columns])
+    assert isinstance(store.memmap("KingSafety"), np.memmap)
+
+    with pytest.raises(ValueError):
+        store.append(matrix[:, :5])
+    with pytest.raises(FileExistsError):
+        FeatureStore.create(path)
+
+
+def test_feature_subset_and_interrupted_append(tmp_path):
+    features = ["checked", "pawn_islands", "knights_mobility"]
+    store = FeatureStore.create(str(tmp_path), features, dtype=np.int8)
+    assert store.groups == ["BoardFeatures", "KingSafety", "PawnStructure"]
+    assert store.group_columns("BoardFeatures") == [
+        "knights_mobility_0", "knights_mobility_1"
+    ]
+    assert store.features == features
+
+    matrix, _ = extract(BOARDS, features=store.features, dtype=np.int8)
+    store.extend(iter(matrix), chunk_size=2)
+    assert len(store) == 3
+    # a row written to one group only, and half a row to another one
+    with open(store.file("KingSafety"), "ab") as f:
+        f.write(b"\x01")
+    with open(store.file("BoardFeatures"), "ab") as f:
+        f.write(b"\x01")
+    assert len(store) == 3
+    assert open_memmap(store.file("KingSafety")).shape == (4, 1)
+    assert open_memmap(store.file("BoardFeatures")).shape == (3, 2)
+    store.append(matrix[:1])
+    assert np.array_equal(store.read(), np.vstack([matrix, matrix[:1]]))
+
+    with pytest.raises(ValueError):
+        FeatureStore.open_or_create(str(tmp_path), ["checked"], np.int8)
+    assert len(FeatureStore.open_or_create(str(tmp_path), features,
+                                           np.int8)) == 4
+
+
+def test_not_a_store(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        FeatureStore(str(tmp_path))
+    path = tmp_path / "x.chevy"
+    path.write_bytes(b"not a store file")
+    with pytest.raises(ValueError):
+        read_header(str(path))
+
+
+def test_pipeline_appends_to_store(tmp_path):
+    pgn = tmp_path / "games.pgn"
+    pgn.write_text(PGN)
+    features = ["material_vector_count", "king_mobility", "pawn_islands"]
+    output = str(tmp_path / "store")
+    for _ in range(2):
+        files = run(str(pgn), output, features=features, shard_size=5,
+                    processes=2, output_format="store")
+    assert sorted(os.path.basename(f) for f in files) == [
+        "BoardFeatures.chevy", "KingSafety.chevy", "PawnStructure.chevy"
+    ]
+
+    store = FeatureStore(output)
+    expected = np.stack(list(iter_features(iter_fens(str(pgn)), features)))
+    assert np.array_equal(store.read(), np.vstack([expected, expected]))
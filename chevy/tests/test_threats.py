@@ -0,0 +1,31 @@
+import chess
+
+from chevy.benchmarks.threats import FENS, threats_vector_reference
+from chevy.threats import threats_vector
+
+
+def test_matches_reference():
+    for fen in FENS:
+        board = chess.Board(fen)
+        for color in chess.COLORS:
+            assert threats_vector(board, color) == \
+                threats_vector_reference(board, color)
+
+
+def test_mate_and_stalemate():
+    # Qe8, Qf8, Qg7 and Qh7 mate, Qa2 / Qb3 / Qc4 / Qd5 / Qe6 stalemate
+    board = chess.Board("7k/5Q2/6K1/8/8/8/8/8 w - - 0 1")
+    assert threats_vector(board, chess.WHITE) == \
+        [0, 0, 0, 0, 6, 0] + [0, 0, 0, 0, 4, 0] + [0, 0, 0, 0, 5, 5]
+    # black king has no moves already, every king move keeps it that way
+    board = chess.Board("k7/8/1QK5/8/8/8/8/8 w - - 0 1")
+    assert threats_vector(board, chess.WHITE)[12:] == [0, 0, 0, 0, 1, 6]
+
+
+def test_board_is_left_untouched():
+    board = chess.Board(FENS[0])
+    board.push_san("a3")
+    fen = board.fen()
+    threats_vector(board, chess.WHITE)
+    assert board.fen() == fen
+    assert board.move_stack == [chess.Move.from_uci("a2a3")]
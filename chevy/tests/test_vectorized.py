@@ -0,0 +1,47 @@
+import chess
+import numpy as np
+import pytest
+
+from chevy import batch, vectorized
+
+FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "5kr1/4pp1p/1Q2q3/1PBP2p1/2P3P1/p7/4P3/1R2K1B1 w - - 0 19",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w Kq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 b - - 0 1",
+    "2r3k1/7R/6PK/6P1/2Q5/8/8/8 b - - 6 73",
+]
+
+
+def test_encode_boards():
+    bitboards = vectorized.encode_boards([chess.Board()])
+    assert bitboards.shape == (1, vectorized.BITBOARD_COLUMNS)
+    assert bitboards[0, 0] == chess.BB_RANK_2
+    assert bitboards[0, 11] == chess.BB_E8
+    assert bitboards[0, vectorized.TURN] == 1
+    assert bitboards[0, vectorized.CASTLING] == chess.BB_CORNERS
+
+
+def test_extract_matches_batch():
+    boards = [chess.Board(fen) for fen in FENS]
+    bitboards = vectorized.encode_boards(boards)
+    colors = [chess.WHITE, chess.BLACK, chess.BLACK, chess.WHITE,
+              chess.BLACK]
+    matrix, columns = vectorized.extract(bitboards, colors)
+    expected, expected_columns = batch.extract(
+        boards, colors, features=list(vectorized.KERNELS)
+    )
+    assert columns == expected_columns
+    assert np.array_equal(matrix, expected)
+
+    for color in chess.COLORS:
+        matrix, _ = vectorized.extract(bitboards, color,
+                                       features=["passed_pawns"])
+        expected, _ = batch.extract(boards, color, features=["passed_pawns"])
+        assert np.array_equal(matrix, expected)
+
+
+def test_extract_unsupported_feature():
+    with pytest.raises(ValueError):
+        vectorized.extract(vectorized.encode_boards([chess.Board()]),
+                           features=["threats_vector"])
@@ -0,0 +1,128 @@
+from __future__ import annotations
+from typing import Dict, List, Optional
+
+import chess
+
+
+def threats_vector(board: chess.Board, color: chess.Color) -> List[int]:
+    # checks, checkmates and stalemates given by legal moves of `color`,
+    # counted per type of the moving piece
+    checks = [0] * len(chess.PIECE_TYPES)
+    checkmates = [0] * len(chess.PIECE_TYPES)
+    stalemates = [0] * len(chess.PIECE_TYPES)
+    if board.turn != color and board.is_check():
+        return checks + checkmates + stalemates
+
+    # every move is tried on a single copy of the board with push/pop, and
+    # only when it may end the game or the check cannot be told from masks
+    board = board.copy(stack=False)
+    board.turn = color
+    their_king = board.king(not color)
+    discoverers = _discovered_check_rays(board, color, their_king)
+    free_pieces = _free_pieces(board, not color, their_king)
+
+    for m in list(board.legal_moves):
+        piece_type = board.piece_type_at(m.from_square)
+        if piece_type is None:
+            continue  # not for legal moves
+        if their_king is None or m.promotion or board.is_castling(m) or \
+                board.is_en_passant(m):
+            check = None
+        else:
+            check = _gives_check(board, m, piece_type, their_king,
+                                 discoverers)
+        # a piece which is not on a line with its king cannot be pinned, so
+        # its moves survive any of our non-checking moves but its capture
+        if check is False and free_pieces & ~chess.BB_SQUARES[m.to_square]:
+            continue
+
+        board.push(m)
+        # the reply generator stops at the first legal move
+        no_replies = not any(board.generate_legal_moves())
+        if board.is_check():
+            checks[piece_type - 1] += 1
+            checkmates[piece_type - 1] += no_replies
+        else:
+            stalemates[piece_type - 1] += no_replies
+        board.pop()
+
+    return checks + checkmates + stalemates
+
+
+def _piece_attacks(piece_type: chess.PieceType, color: chess.Color,
+                   square: chess.Square,
+                   occupied: chess.Bitboard) -> chess.Bitboard:
+    if piece_type == chess.PAWN:
+        return chess.BB_PAWN_ATTACKS[color][square]
+    if piece_type == chess.KNIGHT:
+        return chess.BB_KNIGHT_ATTACKS[square]
+    if piece_type == chess.KING:
+        return chess.BB_KING_ATTACKS[square]
+    attacks = 0
+    if piece_type in (chess.BISHOP, chess.QUEEN):
+        attacks |= chess.BB_DIAG_ATTACKS[square][
+            chess.BB_DIAG_MASKS[square] & occupied]
+    if piece_type in (chess.ROOK, chess.QUEEN):
+        attacks |= (
+                chess.BB_RANK_ATTACKS[square][
+                    chess.BB_RANK_MASKS[square] & occupied] |
+                chess.BB_FILE_ATTACKS[square][
+                    chess.BB_FILE_MASKS[square] & occupied]
+        )
+    return attacks
+
+
+def _discovered_check_rays(board: chess.Board, color: chess.Color,
+                           their_king: Optional[chess.Square]) \
+        -> Dict[chess.Square, chess.Bitboard]:
+    # our pieces standing alone between one of our sliders and their king,
+    # mapped to the squares a move has to stay on to keep the line closed
+    result: Dict[chess.Square, chess.Bitboard] = {}
+    if their_king is None:
+        return result
+    snipers = (
+            (chess.BB_RANK_ATTACKS[their_king][0] |
+             chess.BB_FILE_ATTACKS[their_king][0]) &
+            (board.rooks | board.queens) |
+            chess.BB_DIAG_ATTACKS[their_king][0] &
+            (board.bishops | board.queens)
+    ) & board.occupied_co[color]
+    for sniper in chess.scan_reversed(snipers):
+        between = chess.between(their_king, sniper)
+        blockers = between & board.occupied
+        if blockers and blockers & (blockers - 1) == 0 and \
+                blockers & board.occupied_co[color]:
+            result[chess.lsb(blockers)] = between
+    return result
+
+
+def _free_pieces(board: chess.Board, color: chess.Color,
+                 king: Optional[chess.Square]) -> chess.Bitboard:
+    # pieces (pawns and king aside) off every line through their king with at
+    # least one pseudo-legal move
+    if king is None:
+        return 0
+    lines = chess.BB_RANK_ATTACKS[king][0] | chess.BB_FILE_ATTACKS[king][0] | \
+        chess.BB_DIAG_ATTACKS[king][0]
+    own = board.occupied_co[color]
+    mask = 0
+    for sq in chess.scan_reversed(own & ~board.pawns & ~board.kings & ~lines):
+        if board.attacks_mask(sq) & ~own:
+            mask |= chess.BB_SQUARES[sq]
+    return mask
+
+
+def _gives_check(board: chess.Board, move: chess.Move,
+                 piece_type: chess.PieceType,
+                 their_king: Optional[chess.Square],
+                 discoverers: Dict[chess.Square, chess.Bitboard]) -> bool:
+    # plain moves only (no castling, en passant or promotion)
+    if their_king is None:
+        return False
+    occupied = (board.occupied & ~chess.BB_SQUARES[move.from_square]) | \
+        chess.BB_SQUARES[move.to_square]
+    if _piece_attacks(piece_type, board.turn, move.to_square,
+                      occupied) & chess.BB_SQUARES[their_king]:
+        return True
+    line = discoverers.get(move.from_square)
+    return line is not None and not line & chess.BB_SQUARES[move.to_square]
@@ -1,12 +1,8 @@
-import numpy as np
+from chevy.bitboard import popcount
 
 
 def count_bits(n):
-    count = 0
-    while n:
-        count += n & 1
-        n >>= 1
-    return count
+    return popcount(n)
 
 
 def mirror_uci(uci):
@@ -17,5 +13,7 @@ def mirror_uci(uci):
 
 
 def relative_cp_to_win_proba(cp):
+    import numpy as np
+
     return 1. / (1. + np.power(np.float128(10.),
                                (np.float128(-0.25) * np.float128(cp / 100.))))
@@ -0,0 +1,203 @@
+from __future__ import annotations
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, \
+    Sequence, Tuple, Union
+
+import chess
+import numpy as np
+
+from chevy.batch import FEATURES, schema
+from chevy.bitboard import BB_CENTER, BB_NOT_FILE_A, BB_NOT_FILE_H, \
+    popcount_array
+from chevy.encoding import as_records, castling_rights, is_records, \
+    piece_masks
+
+# layout of a stacked bitboards row: white pawn, knight, bishop, rook, queen,
+# king masks, then the same for black, side to move (1 - white, 0 - black)
+# and cleaned castling rights (as in chess.Board.clean_castling_rights)
+WHITE_PIECES = slice(0, 6)
+BLACK_PIECES = slice(6, 12)
+TURN = 12
+CASTLING = 13
+BITBOARD_COLUMNS = 14
+
+_U64 = np.uint64
+_BB_NOT_FILE_A = _U64(BB_NOT_FILE_A)
+_BB_NOT_FILE_H = _U64(BB_NOT_FILE_H)
+_BB_FILES = [_U64(f) for f in chess.BB_FILES]
+_BB_CENTER = _U64(BB_CENTER)
+_BB_RANK_1 = _U64(chess.BB_RANK_1)
+_BB_RANK_8 = _U64(chess.BB_RANK_8)
+
+
+class _Batch(NamedTuple):
+    our: np.ndarray  # (n, 6) piece masks of the side features are for
+    their: np.ndarray  # (n, 6) opponent piece masks
+    colors: np.ndarray  # (n,) bool
+    castling: np.ndarray  # (n,) uint64
+
+
+def encode_boards(boards: Iterable[chess.Board]) -> np.ndarray:
+    return np.array([
+        [
+            *(b.pieces_mask(piece_type, chess.WHITE)
+              for piece_type in chess.PIECE_TYPES),
+            *(b.pieces_mask(piece_type, chess.BLACK)
+              for piece_type in chess.PIECE_TYPES),
+            int(b.turn),
+            b.clean_castling_rights(),
+        ]
+        for b in boards
+    ], dtype=np.uint64).reshape(-1, BITBOARD_COLUMNS)
+
+
+def from_records(records: np.ndarray) -> np.ndarray:
+    # stacked bitboards of positions packed with chevy.encoding.encode_many,
+    # without creating boards
+    records = as_records(records)
+    bitboards = np.empty((len(records), BITBOARD_COLUMNS), dtype=np.uint64)
+    bitboards[:, :BLACK_PIECES.stop] = piece_masks(records)
+    bitboards[:, TURN] = records["turn"]
+    bitboards[:, CASTLING] = castling_rights(records)
+    return bitboards
+
+
+def extract(bitboards: np.ndarray,
+            colors: Union[chess.Color, Sequence[chess.Color]] = chess.WHITE,
+            features: Optional[Sequence[str]] = None,
+            dtype=np.int16) -> Tuple[np.ndarray, List[str]]:
+    # same columns as chevy.batch.extract, for the features in KERNELS;
+    # bitboards from encode_boards or packed positions (see from_records)
+    if is_records(bitboards):
+        bitboards = from_records(bitboards)
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    names = list(KERNELS) if features is None else list(features)
+    unsupported = [f for f in names if f not in KERNELS]
+    if unsupported:
+        raise ValueError(
+            f"features not available for bitboards: {', '.join(unsupported)}"
+        )
+
+    white = np.broadcast_to(np.asarray(colors, dtype=bool),
+                            (len(bitboards),))
+    batch = _Batch(
+        our=np.where(white[:, None], bitboards[:, WHITE_PIECES],
+                     bitboards[:, BLACK_PIECES]),
+        their=np.where(white[:, None], bitboards[:, BLACK_PIECES],
+                       bitboards[:, WHITE_PIECES]),
+        colors=white,
+        castling=bitboards[:, CASTLING],
+    )
+
+    columns = schema(names)
+    out = np.empty((len(bitboards), len(columns)), dtype=dtype)
+    offset = 0
+    for name in names:
+        _, width = FEATURES[name]
+        out[:, offset:offset + width] = \
+            KERNELS[name](batch).reshape(len(bitboards), width)
+        offset += width
+    return out, columns
+
+
+def pawn_attacks(pawns: np.ndarray, colors: np.ndarray) \
+        -> Tuple[np.ndarray, np.ndarray]:
+    # squares attacked towards the a-file and towards the h-file
+    white = (
+        (pawns << _U64(7)) & _BB_NOT_FILE_H,
+        (pawns << _U64(9)) & _BB_NOT_FILE_A,
+    )
+    black = (
+        (pawns >> _U64(9)) & _BB_NOT_FILE_H,
+        (pawns >> _U64(7)) & _BB_NOT_FILE_A,
+    )
+    return (
+        np.where(colors, white[0], black[0]),
+        np.where(colors, white[1], black[1]),
+    )
+
+
+def _pawns_at_file(pawns: np.ndarray) -> np.ndarray:
+    return np.stack([popcount_array(pawns & f) for f in _BB_FILES], axis=-1)
+
+
+def _material_vector_count(batch: _Batch) -> np.ndarray:
+    return popcount_array(batch.our)
+
+
+def _our_pieces_count(batch: _Batch) -> np.ndarray:
+    return popcount_array(batch.our).sum(axis=1)
+
+
+def _their_pieces_count(batch: _Batch) -> np.ndarray:
+    return popcount_array(batch.their).sum(axis=1)
+
+
+def _all_pieces_count(batch: _Batch) -> np.ndarray:
+    return _our_pieces_count(batch) + _their_pieces_count(batch)
+
+
+def _central_pawns(batch: _Batch) -> np.ndarray:
+    return popcount_array(batch.our[:, 0] & _BB_CENTER)
+
+
+def _open_files_rooks_count(batch: _Batch) -> np.ndarray:
+    pawns = batch.our[:, 0] | batch.their[:, 0]
+    rooks = batch.our[:, 3]
+    count = np.zeros(len(pawns), dtype=np.uint64)
+    for f in _BB_FILES:
+        count += np.where(pawns & f, _U64(0), popcount_array(rooks & f))
+    return count
+
+
+def _isolated_pawns(batch: _Batch) -> np.ndarray:
+    at_file = _pawns_at_file(batch.our[:, 0])
+    padded = np.pad(at_file, ((0, 0), (1, 1)))
+    isolated = (padded[:, :-2] == 0) & (padded[:, 2:] == 0)
+    return (at_file * isolated).sum(axis=1)
+
+
+def _double_pawns(batch: _Batch) -> np.ndarray:
+    return (_pawns_at_file(batch.our[:, 0]) > 1).sum(axis=1)
+
+
+def _passed_pawns(batch: _Batch) -> np.ndarray:
+    our_pawns, their_pawns = batch.our[:, 0], batch.their[:, 0]
+    # squares in front of their pawns (towards our side of the board)
+    south = their_pawns >> _U64(8)
+    north = their_pawns << _U64(8)
+    for shift in (_U64(8), _U64(16), _U64(32)):
+        south |= south >> shift
+        north |= north << shift
+    span = np.where(batch.colors, south, north)
+    span |= ((span << _U64(1)) & _BB_NOT_FILE_A) | \
+        ((span >> _U64(1)) & _BB_NOT_FILE_H)
+    return popcount_array(our_pawns & ~span)
+
+
+def _pawn_threats(batch: _Batch) -> np.ndarray:
+    # one count per attacking pawn and attacked piece, as in our_attacks_map
+    towards_a, towards_h = pawn_attacks(batch.our[:, 0], batch.colors)
+    return (
+            popcount_array(towards_a[:, None] & batch.their) +
+            popcount_array(towards_h[:, None] & batch.their)
+    )
+
+
+def _castling_rights(batch: _Batch) -> np.ndarray:
+    backrank = np.where(batch.colors, _BB_RANK_1, _BB_RANK_8)
+    return (batch.castling & backrank) != 0
+
+
+KERNELS: Dict[str, Callable[[_Batch], np.ndarray]] = {
+    "our_pieces_count": _our_pieces_count,
+    "their_pieces_count": _their_pieces_count,
+    "all_pieces_count": _all_pieces_count,
+    "material_vector_count": _material_vector_count,
+    "pawn_threats": _pawn_threats,
+    "open_files_rooks_count": _open_files_rooks_count,
+    "castling_rights": _castling_rights,
+    "central_pawns": _central_pawns,
+    "isolated_pawns": _isolated_pawns,
+    "double_pawns": _double_pawns,
+    "passed_pawns": _passed_pawns,
+}